@@ -0,0 +1,157 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class LRUCache:
+    """LRU с ограничением по числу записей и TTL на запись."""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.stats.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.stats.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class PageCache:
+    """Отрендеренные страницы: LRU с ограничением по суммарному размеру тел и TTL."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.stats = CacheStats()
+        self._pages: "OrderedDict[Hashable, Tuple[float, bytes, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Any]]:
+        """(тело, метаданные) или None."""
+        entry = self._pages.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            self.stats.misses += 1
+            return None
+        self._pages.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1], entry[2]
+
+    def set(self, key: Hashable, body: bytes, meta: Any = None) -> None:
+        if len(body) > self.max_bytes:
+            return
+        self._drop(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._pages[key] = (expires_at, body, meta)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._pages))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._pages.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def clear(self) -> None:
+        self._pages.clear()
+        self.size = 0
+
+
+class CacheBackend:
+    """Второй, общий между процессами уровень кэша (Redis, memcached, ...)."""
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Атомарно увеличивает целое под key (нет ключа — 0) и отдаёт новое значение."""
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """Локальная замена внешнего хранилища для тестов и разработки."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._data[key] = (float("inf"), str(value))
+        return value
+
+
+def build_backend(name: str) -> Optional[CacheBackend]:
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryBackend()
+    raise ValueError(f"Unknown cache backend: {name}")
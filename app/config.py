@@ -1,3 +1,4 @@
+from typing import List, Literal, Optional
 from pydantic import HttpUrl, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,7 +8,70 @@ class Settings(BaseSettings):
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
     DB_NAME: SecretStr
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # Полный URL подключения вместо DB_* (например, sqlite+aiosqlite:///bench.db для бенчмарков)
+    DATABASE_URL: str = ""
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_SELECTION: Literal["round_robin", "least_latency"] = "round_robin"
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    SEED_MODE: Literal["background", "blocking", "off"] = "background"
+    SEED_TARGET_USERS: int = 1000
+    SEED_SOURCE: Literal["http", "synthetic"] = "http"
+    USER_SOURCE: Literal["http", "synthetic"] = "http"
+    SYNTHETIC_SEED: Optional[int] = None
+    SYNTHETIC_BATCH_SIZE: int = 10000
     RANDOM_USER_API: HttpUrl = "https://randomuser.me/api/"
+    RANDOM_SAMPLER: Literal["order_by_random", "id_range", "tablesample", "reservoir"] = "id_range"
+    RANDOM_RESERVOIR_SIZE: int = 1024
+    RANDOM_SAMPLE_MAX: int = 100
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    INGEST_ON_CONFLICT: Literal["error", "nothing", "update"] = "nothing"
+    DEDUP_BATCH_SIZE: int = 5000
+    USER_COUNT_MODE: Literal["exact", "cached", "estimate", "counter_table"] = "cached"
+    USER_COUNT_TTL: float = 30.0
+    BATCH_MAX_IDS: int = 100
+    EXPORT_CHUNK_SIZE: int = 1000
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 100
+    IMPORT_MAX_DECOMPRESSED_BYTES: int = 1024 ** 3
+    LOCATION_BACKFILL_BATCH_SIZE: int = 1000
+    RESET_MODE: Literal["auto", "batched", "swap", "truncate"] = "auto"
+    RESET_BATCH_SIZE: int = 5000
+    RESET_LOCK_TIMEOUT: float = 5.0
+    JOB_PROGRESS_INTERVAL: float = 1.0
+    JOB_RETENTION_SECONDS: float = 86400.0
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 300.0
+    USER_CACHE_BACKEND: Literal["none", "memory"] = "none"
+    RANDOM_USER_PAGE_SIZE: int = 1000
+    RANDOM_USER_CONCURRENCY: int = 4
+    RANDOM_USER_MAX_RETRIES: int = 3
+    RANDOM_USER_RETRY_BACKOFF: float = 0.25
+    RANDOM_USER_MAX_BACKOFF: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 10
+    HTTP_CACHE_CONTROL: str = "public, max-age=300"
+    HTTP_VERSION_MAP_SIZE: int = 100000
+    HTTP_VERSION_MAP_TTL: float = 60.0
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PAGE_CACHE_TTL: float = 60.0
+    TEMPLATE_BYTECODE_CACHE: bool = True
+    TEMPLATE_BYTECODE_CACHE_DIR: str = ""
+    TEMPLATE_AUTO_RELOAD: bool = True
+    METRICS_ENABLED: bool = True
+    PICTURE_CACHE_ENABLED: bool = False
+    PICTURE_CACHE_DIR: str = "data/pictures"
+    PICTURE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PICTURE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+    PICTURE_DOWNLOAD_CONCURRENCY: int = 16
+    PICTURE_MAX_FILE_BYTES: int = 1024 * 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -17,10 +81,13 @@ class Settings(BaseSettings):
 
     @property
     def database_url(self) -> str:
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return (
             f"postgresql+asyncpg://{self.DB_USER}:"
             f"{self.DB_PASSWORD.get_secret_value()}@"
             f"{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME.get_secret_value()}"
+            f"?prepared_statement_cache_size={self.DB_STATEMENT_CACHE_SIZE}"
         )
 
 settings = Settings()
\ No newline at end of file
@@ -1,26 +1,210 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import AsyncGenerator
+import itertools
+import time
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.schema import ExecutableDDLElement
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from typing import AsyncGenerator, Dict, List, Optional
 from app.config import settings
+from app.metrics import DB_POOL_WAIT
 
-engine = create_async_engine(
-    settings.database_url,  # Используем новое свойство
-    pool_pre_ping=True,
-    echo=False
-)
 
-async_session = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False
+@dataclass
+class PoolWaitStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool, который считает время ожидания свободного соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_stats.checkouts += 1
+            self.wait_stats.total_wait += waited
+            self.wait_stats.max_wait = max(self.wait_stats.max_wait, waited)
+            DB_POOL_WAIT.observe(waited)
+
+
+def enable_sqlite_savepoints(engine: AsyncEngine) -> None:
+    """pysqlite/aiosqlite сами открывают и закрывают транзакции, из-за чего
+    RELEASE SAVEPOINT фиксирует всю внешнюю транзакцию. Отключаем это и
+    открываем транзакцию явным BEGIN."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # Каждое соединение с :memory: — отдельная пустая база, пул из одного соединения
+        pool_options = {"poolclass": StaticPool}
+    else:
+        pool_options = {
+            "poolclass": MeteredQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+    engine = create_async_engine(url, echo=False, **pool_options)
+    if parsed.get_backend_name() == "sqlite":
+        enable_sqlite_savepoints(engine)
+    return engine
+
+
+class ReplicaRouter:
+    """Выбирает движок для чтения: реплики по кругу или с наименьшей задержкой."""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        selection: str = "round_robin",
+        read_your_writes: float = 0.0,
+    ):
+        self.primary = primary.sync_engine
+        self.replicas = [replica.sync_engine for replica in replicas]
+        self.selection = selection
+        self.read_your_writes = read_your_writes
+        self.latency: Dict[Engine, float] = {replica: 0.0 for replica in self.replicas}
+        self._round_robin = itertools.cycle(self.replicas)
+        self._last_write = float("-inf")
+        for replica in self.replicas:
+            event.listen(replica, "before_cursor_execute", self._before_execute)
+            event.listen(replica, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        # Экспоненциальное среднее: быстро реагирует на деградацию реплики
+        self.latency[conn.engine] = 0.8 * self.latency[conn.engine] + 0.2 * elapsed
+
+    def mark_write(self) -> None:
+        self._last_write = time.monotonic()
+
+    def reader(self) -> Engine:
+        if not self.replicas or time.monotonic() - self._last_write < self.read_your_writes:
+            return self.primary
+        if self.selection == "least_latency":
+            return min(self.replicas, key=self.latency.__getitem__)
+        return next(self._round_robin)
+
+
+class RoutingSession(Session):
+    """SELECT уходят на реплики, всё остальное и flush — на primary.
+
+    Текстовый SQL идёт на primary, если он не помечен
+    execution_options(readonly=True); SELECT с execution_options(primary=True)
+    тоже читает с primary. Сессия читает с одной реплики,
+    выбранной при первом чтении, а после первой записи — с primary.
+    Окно read-your-writes открывают только flush, DML и DDL.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: ReplicaRouter = self.info["router"]
+        if self._flushing or isinstance(clause, (UpdateBase, ExecutableDDLElement)):
+            self.info["wrote"] = True
+            router.mark_write()
+            return router.primary
+        if self.info.get("wrote") or not _is_read(clause):
+            return router.primary
+        if "reader" not in self.info:
+            self.info["reader"] = router.reader()
+        return self.info["reader"]
+
+
+def _is_read(clause) -> bool:
+    if clause is None:
+        return False
+    options = clause.get_execution_options()
+    if options.get("primary", False):
+        return False
+    return getattr(clause, "is_select", False) or options.get("readonly", False)
+
+
+def build_session_factory(
+    primary: AsyncEngine,
+    replicas: Optional[List[AsyncEngine]] = None,
+    selection: str = "round_robin",
+    read_your_writes: float = 0.0,
+) -> sessionmaker:
+    options = dict(bind=primary, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    if not replicas:
+        return sessionmaker(**options)
+    router = ReplicaRouter(primary, replicas, selection, read_your_writes)
+    return sessionmaker(**options, sync_session_class=RoutingSession, info={"router": router})
+
+
+engine = create_engine_from_settings(settings.database_url)  # Используем новое свойство
+replica_engines = [create_engine_from_settings(url) for url in settings.DB_REPLICA_URLS]
+
+async_session = build_session_factory(
+    engine,
+    replica_engines,
+    selection=settings.DB_REPLICA_SELECTION,
+    read_your_writes=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
 Base = declarative_base()
 
+
+def get_pool_stats(db_engine: AsyncEngine = engine) -> dict:
+    pool = db_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update({
+            "checkouts": wait_stats.checkouts,
+            "timeouts": wait_stats.timeouts,
+            "wait_total_seconds": wait_stats.total_wait,
+            "wait_max_seconds": wait_stats.max_wait,
+        })
+    return stats
+
+
+def get_session_factory() -> sessionmaker:
+    """Фабрика сессий для фоновых задач, которые живут дольше запроса."""
+    return async_session
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    # Соединение берётся из пула только при первом запросе к БД,
+    # а возвращается при выходе из контекста сессии
     async with async_session() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
\ No newline at end of file
+        yield session
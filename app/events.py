@@ -0,0 +1,20 @@
+from typing import Callable, List
+
+_users_changed_listeners: List[Callable[[], None]] = []
+
+
+def on_users_changed(listener: Callable[[], None]) -> Callable[[], None]:
+    """Регистрирует сброс кэша, который зависит от содержимого таблицы users."""
+    _users_changed_listeners.append(listener)
+    return listener
+
+
+def off_users_changed(listener: Callable[[], None]) -> None:
+    """Снимает слушателя, зарегистрированного через on_users_changed."""
+    if listener in _users_changed_listeners:
+        _users_changed_listeners.remove(listener)
+
+
+def notify_users_changed() -> None:
+    for listener in list(_users_changed_listeners):
+        listener()
@@ -0,0 +1,137 @@
+"""Условные GET для ресурсов пользователя: ETag, Last-Modified, Cache-Control.
+
+ETag — хэш отданного тела. Последняя версия каждого ресурса хранится в
+VersionMap, поэтому повторный запрос с совпадающим If-None-Match получает
+304 без обращения к БД и без сериализации. VersionMap своя у каждого
+воркера, и записи в чужих воркерах она не видит: версии живут не дольше
+max-age ответа и TTL кэша пользователей.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Hashable, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+from app.cache import LRUCache
+from app.config import settings
+from app.events import on_users_changed
+
+
+class Version(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite возвращает naive datetime, в БД время хранится в UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match сравнивается слабо: префикс W/ не учитывается
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def is_not_modified(request: Request, version: Version) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # При наличии If-None-Match заголовок If-Modified-Since игнорируется (RFC 9110)
+        return etag_matches(if_none_match, version.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(version.last_modified) <= _utc(since)
+    return False
+
+
+def cache_headers(version: Version) -> Dict[str, str]:
+    headers = {"ETag": version.etag, "Cache-Control": settings.HTTP_CACHE_CONTROL}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(version.last_modified), usegmt=True)
+    return headers
+
+
+def not_modified(version: Version) -> Response:
+    return Response(status_code=304, headers=cache_headers(version))
+
+
+class VersionMap:
+    """Последние отданные версии ресурсов; сбрасывается при изменении users."""
+
+    def __init__(self, max_size: int = 100000, ttl: Optional[float] = None):
+        self.versions = LRUCache(max_size=max_size, ttl=ttl)
+
+    def get(self, key: Hashable) -> Optional[Version]:
+        return self.versions.get(key)
+
+    def set(self, key: Hashable, version: Version) -> None:
+        self.versions.set(key, version)
+
+    def clear(self) -> None:
+        self.versions.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.versions),
+            "hits": self.versions.stats.hits,
+            "misses": self.versions.stats.misses,
+            "evictions": self.versions.stats.evictions,
+        }
+
+
+_version_map: Optional[VersionMap] = None
+
+
+def version_ttl() -> float:
+    limits = [settings.HTTP_VERSION_MAP_TTL, settings.USER_CACHE_TTL]
+    max_age = re.search(r"max-age=(\d+)", settings.HTTP_CACHE_CONTROL)
+    if max_age is not None:
+        limits.append(float(max_age.group(1)))
+    return min(limits)
+
+
+def get_version_map() -> VersionMap:
+    global _version_map
+    if _version_map is None:
+        _version_map = VersionMap(max_size=settings.HTTP_VERSION_MAP_SIZE, ttl=version_ttl())
+        on_users_changed(_version_map.clear)
+    return _version_map
+
+
+def cached_version(request: Request, key: Hashable) -> Optional[Response]:
+    """304 по сохранённой версии, если клиент прислал подходящий валидатор."""
+    if "if-none-match" not in request.headers and "if-modified-since" not in request.headers:
+        return None
+    version = get_version_map().get(key)
+    if version is not None and is_not_modified(request, version):
+        return not_modified(version)
+    return None
+
+
+def conditional_response(
+    request: Request,
+    key: Hashable,
+    body: bytes,
+    media_type: str,
+    last_modified: Optional[datetime] = None,
+) -> Response:
+    version = Version(make_etag(body), last_modified)
+    get_version_map().set(key, version)
+    if is_not_modified(request, version):
+        return not_modified(version)
+    return Response(content=body, media_type=media_type, headers=cache_headers(version))
@@ -0,0 +1,78 @@
+"""Структурированный адрес пользователя и совместимость со старой строкой location.
+
+Раньше адрес хранился одной строкой вида
+"Country: X\\nState: Y\\nCity: Z\\nStreet: N name"; теперь он лежит в
+отдельных колонках, а строка собирается только для старых клиентов.
+"""
+from typing import Any, Dict, List, Optional
+
+LOCATION_FIELDS = ("country", "state", "city", "street_number", "street_name", "latitude", "longitude")
+MISSING = "N/A"
+
+
+def location_lines(
+    country: Optional[str] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    street_number: Optional[int] = None,
+    street_name: Optional[str] = None,
+) -> List[str]:
+    def value(item: Any) -> str:
+        return MISSING if item is None else str(item)
+
+    return [
+        f"Country: {value(country)}",
+        f"State: {value(state)}",
+        f"City: {value(city)}",
+        f"Street: {value(street_number)} {value(street_name)}",
+    ]
+
+
+def format_location(**fields: Any) -> str:
+    return "\n".join(location_lines(**fields))
+
+
+def has_location(row: Any) -> bool:
+    if isinstance(row, dict):
+        return any(row.get(name) is not None for name in LOCATION_FIELDS[:5])
+    return any(getattr(row, name, None) is not None for name in LOCATION_FIELDS[:5])
+
+
+def user_location_lines(user: Any) -> List[str]:
+    """Строки адреса для шаблонов: из колонок, а у старых строк — из location."""
+    if has_location(user):
+        return location_lines(
+            country=user.country, state=user.state, city=user.city,
+            street_number=user.street_number, street_name=user.street_name,
+        )
+    return user.location.split("\n") if user.location else []
+
+
+def parse_location(text: str) -> Dict[str, Any]:
+    """Разбирает старую строку location; нераспознанные строки пропускаются."""
+    parsed: Dict[str, Any] = {}
+    for line in text.split("\n"):
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip().lower(), value.strip()
+        if key in ("country", "state", "city"):
+            if value and value != MISSING:
+                parsed[key] = value
+        elif key == "street":
+            number, _, name = value.partition(" ")
+            if number.isdigit():
+                parsed["street_number"] = int(number)
+            elif number and number != MISSING:
+                name = value
+            if name and name != MISSING:
+                parsed["street_name"] = name
+    return parsed
+
+
+def parse_coordinate(value: Any) -> Optional[float]:
+    # randomuser.me отдаёт координаты строками
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
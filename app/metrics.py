@@ -0,0 +1,228 @@
+"""Метрики в текстовом формате Prometheus.
+
+Счётчики и гистограммы хранятся в памяти процесса и отдаются с /metrics;
+при нескольких воркерах каждый отдаёт свои, суммирует их Prometheus.
+Наблюдение — поиск корзины и пара сложений, поэтому метрики можно держать
+включёнными в проде. METRICS_ENABLED=false выключает и сбор, и эндпоинт.
+"""
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SQL_OPERATION = re.compile(r"\s*(\w+)")
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY", "TRUNCATE"}
+
+Labels = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if settings.METRICS_ENABLED:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        if settings.METRICS_ENABLED:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [счётчики по корзинам (последняя — +Inf), сумма]
+        self.series: Dict[Labels, List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self.series.get(labels)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> Iterator[str]:
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+            suffix = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{suffix} {_format_value(total)}"
+            yield f"{self.name}_count{suffix} {cumulative}"
+
+
+REGISTRY: List[Metric] = []
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route", "status")
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запроса", ("operation",), buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Ожидание свободного соединения в пуле", buckets=DB_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections", "Соединения пула основной БД", ("state",))
+INGEST_STAGE_DURATION = Histogram(
+    "ingest_stage_duration_seconds", "Этапы загрузки пользователей (на страницу)", ("stage",)
+)
+INGEST_ROWS = Counter("ingest_rows_total", "Строки, обработанные загрузкой пользователей", ("result",))
+INGEST_ROWS_PER_SECOND = Gauge("ingest_rows_per_second", "Скорость последней загрузки пользователей")
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: гистограмма длительности запросов по шаблону маршрута.
+
+    Метка route — шаблон пути (/api/v1/{user_id}), а не сам путь, чтобы
+    число рядов не росло с числом пользователей.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        observed = False
+
+        def observe():
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            # Замер заканчивается на последнем байте ответа: BackgroundTasks
+            # выполняются уже после него и в задержку запроса не входят
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if not observed:
+                observe()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_query_started"].pop()
+    match = SQL_OPERATION.match(statement)
+    operation = match.group(1).upper() if match else ""
+    DB_QUERY_DURATION.observe(
+        time.perf_counter() - started, operation if operation in SQL_OPERATIONS else "OTHER"
+    )
+
+
+def _handle_error(context):
+    # after_cursor_execute при ошибке не вызывается, снимаем отметку здесь
+    if context.connection is not None:
+        started = context.connection.info.get("metrics_query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,139 @@
+"""Идемпотентные миграции схемы поверх Base.metadata.create_all.
+
+create_all создаёт только отсутствующие таблицы, поэтому новые колонки
+и индексы существующей таблицы users добавляются здесь. Применённые
+версии записываются в schema_migrations.
+
+Каждый воркер uvicorn вызывает run_migrations при старте; на PostgreSQL
+они выполняют её по очереди под transaction-level advisory lock.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import Base
+from app.models.user import USER_EXTENSIONS, User, drop_user_count_triggers, install_user_count_triggers
+
+# Произвольная, но постоянная константа для pg_advisory_xact_lock
+MIGRATION_LOCK_ID = 0x5EED_0002
+
+migrations_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", String(100), primary_key=True),
+)
+
+
+def add_missing_columns(conn: Connection, table: Table, names: List[str]) -> None:
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    for name in names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+
+
+def create_missing_indexes(conn: Connection, table: Table, names: List[str]) -> None:
+    # Отражение не видит индексы по выражениям, поэтому IF NOT EXISTS, а не checkfirst
+    for index in table.indexes:
+        if index.name in names:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def structured_location(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        for extension in USER_EXTENSIONS:
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+    add_missing_columns(
+        conn, User.__table__, ["country", "state", "city", "street_number", "street_name"]
+    )
+    create_missing_indexes(conn, User.__table__, [
+        "ix_users_country_gender",
+        "ix_users_first_name_lower",
+        "ix_users_last_name_lower",
+        "ix_users_email_lower",
+    ])
+    if conn.dialect.name == "postgresql":
+        create_missing_indexes(conn, User.__table__, [
+            "ix_users_first_name_trgm",
+            "ix_users_last_name_trgm",
+            "ix_users_email_trgm",
+        ])
+
+
+def location_coordinates(conn: Connection) -> None:
+    # Сами данные переносит задача backfill_locations, здесь только схема
+    add_missing_columns(conn, User.__table__, ["latitude", "longitude"])
+    create_missing_indexes(conn, User.__table__, ["ix_users_location"])
+
+
+def updated_at(conn: Connection) -> None:
+    add_missing_columns(conn, User.__table__, ["updated_at"])
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT now()"))
+    conn.execute(text("UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+
+
+def external_id(conn: Connection) -> None:
+    add_missing_columns(conn, User.__table__, ["external_id"])
+    create_missing_indexes(conn, User.__table__, ["ux_users_external_id"])
+
+
+def picture_hash(conn: Connection) -> None:
+    add_missing_columns(conn, User.__table__, ["picture_hash"])
+    create_missing_indexes(conn, User.__table__, ["ix_users_picture_hash"])
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_structured_location", structured_location),
+    ("0002_location_coordinates", location_coordinates),
+    ("0003_updated_at", updated_at),
+    ("0004_external_id", external_id),
+    ("0005_picture_hash", picture_hash),
+]
+
+
+def apply_migrations(conn: Connection) -> List[str]:
+    migrations_metadata.create_all(conn)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    done = []
+    for version, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(conn)
+        conn.execute(schema_migrations.insert().values(version=version))
+        done.append(version)
+    return done
+
+
+def sync_user_count_triggers(conn: Connection) -> None:
+    """Ставит триггеры users_count в режиме counter_table и снимает в остальных."""
+    if settings.USER_COUNT_MODE == "counter_table":
+        install_user_count_triggers(conn)
+    else:
+        drop_user_count_triggers(conn)
+        # Без триггеров total устаревает; при включении режима пересчитается заново
+        conn.execute(text("DELETE FROM users_count"))
+
+
+def _migrate(conn: Connection) -> List[str]:
+    Base.metadata.create_all(conn)
+    done = apply_migrations(conn)
+    sync_user_count_triggers(conn)
+    return done
+
+
+async def run_migrations(engine: AsyncEngine) -> List[str]:
+    """create_all и миграции одной транзакцией; возвращает применённые версии."""
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Lock снимается с концом транзакции; остальные воркеры ждут и
+            # потом видят уже готовую схему
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        return await conn.run_sync(_migrate)
@@ -1,2 +1,3 @@
-from .user import Base, User
-__all__ = ['Base', 'User']
\ No newline at end of file
+from .user import Base, User, UserCount
+from .job import JobRecord
+__all__ = ['Base', 'User', 'UserCount', 'JobRecord']
@@ -0,0 +1,17 @@
+from sqlalchemy import JSON, Column, Float, Integer, String, Text
+from app.database import Base
+
+
+class JobRecord(Base):
+    """Состояние фоновой задачи, общее для всех воркеров (см. app/services/jobs.py)."""
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(Float, nullable=False, index=True)
+    finished_at = Column(Float)
@@ -1,14 +1,138 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Text, DDL, event, func, text
+from sqlalchemy.engine import Connection
 from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
+    # login.uuid из randomuser.me; у строк, загруженных до его появления, NULL
+    external_id = Column(String(36))
     gender = Column(String(10))
     first_name = Column(String(50))
     last_name = Column(String(50))
     email = Column(String(100))
     phone = Column(String(30))
+    # Устаревшая строка адреса: новые строки её не заполняют, backfill переносит в колонки ниже
     location = Column(Text)
-    picture_url = Column(Text)
\ No newline at end of file
+    picture_url = Column(Text)
+    # sha256 локальной копии picture_url (см. app/services/pictures.py)
+    picture_hash = Column(String(64))
+    country = Column(String(60))
+    state = Column(String(60))
+    city = Column(String(60))
+    street_number = Column(Integer)
+    street_name = Column(String(100))
+    latitude = Column(Float)
+    longitude = Column(Float)
+    # Источник Last-Modified; default на клиенте нужен таблицам, обновлённым миграцией
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_users_country_gender", "country", "gender"),
+        Index("ix_users_location", "country", "state", "city"),
+        Index("ux_users_external_id", "external_id", unique=True),
+        Index("ix_users_picture_hash", "picture_hash"),
+        # Префиксный поиск: lower(col) LIKE 'q%'
+        Index(
+            "ix_users_first_name_lower",
+            func.lower(first_name).label("first_name_lower"),
+            postgresql_ops={"first_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_last_name_lower",
+            func.lower(last_name).label("last_name_lower"),
+            postgresql_ops={"last_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_lower",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        # Поиск по подстроке: col ILIKE '%q%' (pg_trgm)
+        Index(
+            "ix_users_first_name_trgm", "first_name",
+            postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_last_name_trgm", "last_name",
+            postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_users_email_trgm", "email",
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class UserCount(Base):
+    __tablename__ = "users_count"
+
+    id = Column(Integer, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+
+
+# tsm_system_rows нужно для TABLESAMPLE SYSTEM_ROWS в TableSampleSampler,
+# pg_trgm — для GIN-индексов поиска по подстроке
+USER_EXTENSIONS = ("tsm_system_rows", "pg_trgm")
+
+for extension in USER_EXTENSIONS:
+    event.listen(
+        User.__table__,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}").execute_if(dialect="postgresql")
+    )
+
+# Триггеры для USER_COUNT_MODE=counter_table. Ставятся только в этом режиме
+# (app/migrations.py): каждый INSERT/DELETE платит за UPDATE одной строки
+# users_count, а на PostgreSQL пишущие транзакции упираются в её блокировку.
+# Все выражения идемпотентны.
+USER_COUNT_TRIGGERS = ("users_count_insert", "users_count_delete", "users_count_truncate")
+USER_COUNT_DDL = {
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION users_count_refresh() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE users_count SET total = total + (SELECT count(*) FROM changed_rows) WHERE id = 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE users_count SET total = total - (SELECT count(*) FROM changed_rows) WHERE id = 1;
+            ELSE
+                UPDATE users_count SET total = 0 WHERE id = 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "CREATE OR REPLACE TRIGGER users_count_insert AFTER INSERT ON users "
+        "REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION users_count_refresh()",
+        "CREATE OR REPLACE TRIGGER users_count_delete AFTER DELETE ON users "
+        "REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION users_count_refresh()",
+        "CREATE OR REPLACE TRIGGER users_count_truncate AFTER TRUNCATE ON users "
+        "FOR EACH STATEMENT EXECUTE FUNCTION users_count_refresh()",
+        "INSERT INTO users_count (id, total) SELECT 1, count(*) FROM users ON CONFLICT (id) DO NOTHING",
+    ],
+    "sqlite": [
+        "CREATE TRIGGER IF NOT EXISTS users_count_insert AFTER INSERT ON users "
+        "BEGIN UPDATE users_count SET total = total + 1 WHERE id = 1; END",
+        "CREATE TRIGGER IF NOT EXISTS users_count_delete AFTER DELETE ON users "
+        "BEGIN UPDATE users_count SET total = total - 1 WHERE id = 1; END",
+        "INSERT OR IGNORE INTO users_count (id, total) SELECT 1, count(*) FROM users",
+    ],
+}
+
+
+
+def install_user_count_triggers(conn: Connection) -> None:
+    for statement in USER_COUNT_DDL.get(conn.dialect.name, []):
+        conn.execute(text(statement))
+
+
+def drop_user_count_triggers(conn: Connection, table: str = "users") -> None:
+    for trigger in USER_COUNT_TRIGGERS:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {trigger} ON "{table}"'))
+        else:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
@@ -0,0 +1,194 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import CacheBackend, LRUCache, build_backend
+from app.config import settings
+from app.events import on_users_changed
+from app.repositories.sampling import RandomSampler
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import User
+
+# Общее для всех процессов поколение записей в backend
+GENERATION_KEY = "user:generation"
+
+
+class UserCache:
+    """Read-through кэш пользователей по id: LRU в процессе + общий backend.
+
+    Ключи backend содержат поколение из GENERATION_KEY в том же backend:
+    invalidate() в любом процессе увеличивает его, и старые записи перестают
+    читаться всеми процессами. Локальный LRU других процессов при этом живёт
+    до своего TTL. Результат загрузки, начатой до invalidate(), возвращается
+    вызывающему, но не кэшируется.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0, backend: Optional[CacheBackend] = None):
+        self.local = LRUCache(max_size=max_size, ttl=ttl)
+        self.ttl = ttl
+        self.backend = backend
+        self.backend_hits = 0
+        # Локальное поколение: отсекает загрузки, начатые до invalidate()
+        self._generation = 0
+        self._pending_bumps = 0
+        self._bump_tasks: Set[asyncio.Task] = set()
+        self._inflight: Dict[Tuple[int, int], asyncio.Future] = {}
+
+    def _backend_key(self, user_id: int, generation: int) -> str:
+        return f"user:{generation}:{user_id}"
+
+    def invalidate(self) -> None:
+        self.local.clear()
+        self._generation += 1
+        if self.backend is None:
+            return
+        self._pending_bumps += 1
+        try:
+            task = asyncio.get_running_loop().create_task(self._shared_generation())
+        except RuntimeError:
+            # Вне event loop увеличим поколение при следующем обращении к backend
+            return
+        self._bump_tasks.add(task)
+        task.add_done_callback(self._bump_tasks.discard)
+
+    async def _shared_generation(self) -> int:
+        """Поколение в backend; сначала отправляет накопленные invalidate()."""
+        while self._pending_bumps:
+            self._pending_bumps -= 1
+            await self.backend.incr(GENERATION_KEY)
+        return int(await self.backend.get(GENERATION_KEY) or 0)
+
+    def peek(self, user_id: int) -> Optional[User]:
+        return self.local.get(user_id)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    async def put(self, user: User, generation: Optional[int] = None) -> None:
+        """generation — поколение на момент чтения user из БД."""
+        if generation is None:
+            generation = self._generation
+        elif generation != self._generation:
+            return
+        self.local.set(user.id, user)
+        if self.backend is not None:
+            await self._store(user, await self._shared_generation())
+
+    async def _store(self, user: User, shared: int) -> None:
+        await self.backend.set(self._backend_key(user.id, shared), user.model_dump_json(), self.ttl)
+
+    async def get_or_load(
+        self, user_id: int, loader: Callable[[], Awaitable[Optional[object]]]
+    ) -> Optional[User]:
+        user = self.local.get(user_id)
+        if user is not None:
+            return user
+
+        # Параллельные промахи по одному id ждут один и тот же запрос,
+        # но только в пределах поколения
+        key = (self._generation, user_id)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            user = await self._load(user_id, loader, key[0])
+            future.set_result(user)
+            return user
+        except BaseException as e:
+            future.set_exception(e)
+            # Исключение уже получил вызывающий код, ожидающих может не быть
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(
+        self, user_id: int, loader: Callable[[], Awaitable[Optional[object]]], generation: int
+    ) -> Optional[User]:
+        shared = None
+        if self.backend is not None:
+            shared = await self._shared_generation()
+            payload = await self.backend.get(self._backend_key(user_id, shared))
+            if payload is not None:
+                self.backend_hits += 1
+                user = User.model_validate_json(payload)
+                if generation == self._generation:
+                    self.local.set(user_id, user)
+                return user
+
+        row = await loader()
+        if row is None:
+            return None
+        user = User.model_validate(row)
+        if generation == self._generation:
+            self.local.set(user_id, user)
+            if shared is not None:
+                await self._store(user, shared)
+        return user
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.local),
+            "hits": self.local.stats.hits,
+            "misses": self.local.stats.misses,
+            "evictions": self.local.stats.evictions,
+            "backend_hits": self.backend_hits,
+        }
+
+
+class CachedUserRepository(UserRepository):
+    def __init__(
+        self,
+        session: AsyncSession,
+        sampler: Optional[RandomSampler] = None,
+        cache: Optional[UserCache] = None,
+    ):
+        super().__init__(session, sampler)
+        self.cache = cache or get_user_cache()
+
+    async def get_user(self, user_id: int) -> Optional[User]:
+        if self.cache is None:
+            return await super().get_user(user_id)
+        load = super().get_user
+        return await self.cache.get_or_load(user_id, lambda: load(user_id))
+
+    async def get_users_by_ids(self, user_ids: Sequence[int]) -> List[User]:
+        if self.cache is None:
+            return await super().get_users_by_ids(user_ids)
+
+        generation = self.cache.generation
+        users, missing = [], []
+        for user_id in user_ids:
+            user = self.cache.local.get(user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                users.append(user)
+
+        for row in await super().get_users_by_ids(missing):
+            user = User.model_validate(row)
+            await self.cache.put(user, generation)
+            users.append(user)
+        return users
+
+
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> Optional[UserCache]:
+    global _user_cache
+    if not settings.USER_CACHE_ENABLED:
+        return None
+    if _user_cache is None:
+        _user_cache = UserCache(
+            max_size=settings.USER_CACHE_SIZE,
+            ttl=settings.USER_CACHE_TTL,
+            backend=build_backend(settings.USER_CACHE_BACKEND),
+        )
+        on_users_changed(_user_cache.invalidate)
+    return _user_cache
@@ -0,0 +1,94 @@
+import time
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.events import on_users_changed
+from app.models.user import User, UserCount
+
+
+class UserCounter:
+    async def count(self, session: AsyncSession) -> int:
+        raise NotImplementedError
+
+
+class ExactCounter(UserCounter):
+    async def count(self, session: AsyncSession) -> int:
+        result = await session.execute(select(func.count(User.id)))
+        return result.scalar()
+
+
+class CachedCounter(UserCounter):
+    """Точный COUNT, который живёт ttl секунд или до изменения таблицы."""
+
+    def __init__(self, ttl: float = 30.0, source: Optional[UserCounter] = None):
+        self.ttl = ttl
+        self.source = source or ExactCounter()
+        self._value: Optional[int] = None
+        self._expires_at = 0.0
+
+    def invalidate(self) -> None:
+        self._value = None
+
+    async def count(self, session: AsyncSession) -> int:
+        if self._value is None or time.monotonic() >= self._expires_at:
+            self._value = await self.source.count(session)
+            self._expires_at = time.monotonic() + self.ttl
+        return self._value
+
+
+class EstimateCounter(UserCounter):
+    """Оценка планировщика из pg_class.reltuples, обновляется ANALYZE/autovacuum."""
+
+    def __init__(self, fallback: Optional[UserCounter] = None):
+        self.fallback = fallback or CachedCounter()
+
+    async def count(self, session: AsyncSession) -> int:
+        if session.bind.dialect.name != "postgresql":
+            return await self.fallback.count(session)
+
+        result = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass")
+            .execution_options(readonly=True)
+        )
+        estimate = result.scalar()
+        # -1: таблицу ещё ни разу не анализировали
+        if estimate is None or estimate < 0:
+            return await self.fallback.count(session)
+        return estimate
+
+
+class CounterTableCounter(UserCounter):
+    """Счётчик в users_count, который поддерживают триггеры на users."""
+
+    async def count(self, session: AsyncSession) -> int:
+        result = await session.execute(select(UserCount.total).where(UserCount.id == 1))
+        return result.scalar() or 0
+
+
+def build_counter(mode: str) -> UserCounter:
+    if mode == "exact":
+        return ExactCounter()
+    if mode == "cached":
+        counter = CachedCounter(ttl=settings.USER_COUNT_TTL)
+        on_users_changed(counter.invalidate)
+        return counter
+    if mode == "estimate":
+        counter = CachedCounter(ttl=settings.USER_COUNT_TTL)
+        on_users_changed(counter.invalidate)
+        return EstimateCounter(fallback=counter)
+    if mode == "counter_table":
+        return CounterTableCounter()
+    raise ValueError(f"Unknown user count mode: {mode}")
+
+
+_default_counter: Optional[UserCounter] = None
+
+
+def get_user_counter() -> UserCounter:
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = build_counter(settings.USER_COUNT_MODE)
+    return _default_counter
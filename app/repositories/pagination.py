@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass
+class Cursor:
+    direction: str
+    id: int
+    page: int = 1
+
+
+@dataclass
+class KeysetPage:
+    items: List
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    page: int = 1
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps({"d": cursor.direction, "id": cursor.id, "p": cursor.page}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> Cursor:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor = Cursor(payload["d"], int(payload["id"]), int(payload.get("p", 1)))
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor.direction not in (NEXT, PREV):
+        raise ValueError("Invalid cursor")
+    return cursor
@@ -0,0 +1,255 @@
+import asyncio
+import random
+from collections import deque
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.events import on_users_changed
+from app.models.user import User
+from app.repositories.statements import GET_USER, id_in
+
+
+class RandomSampler:
+    async def pick(self, session: AsyncSession) -> Optional[User]:
+        raise NotImplementedError
+
+    async def sample(
+        self,
+        session: AsyncSession,
+        n: int,
+        where: Sequence = (),
+        rng: Optional[random.Random] = None,
+    ) -> List[User]:
+        return await IdRangeSampler(rng=rng).sample(session, n, where)
+
+
+class OrderByRandomSampler(RandomSampler):
+    """Исходная стратегия: полный скан и сортировка таблицы на каждый вызов."""
+
+    async def pick(self, session: AsyncSession) -> Optional[User]:
+        result = await session.execute(
+            select(User).order_by(func.random()).limit(1)
+        )
+        return result.scalars().first()
+
+    async def sample(
+        self,
+        session: AsyncSession,
+        n: int,
+        where: Sequence = (),
+        rng: Optional[random.Random] = None,
+    ) -> List[User]:
+        # random() в БД не управляется rng, воспроизводимости здесь нет
+        result = await session.execute(
+            select(User).where(*where).order_by(func.random()).limit(n)
+        )
+        return list(result.scalars().all())
+
+
+class IdRangeSampler(RandomSampler):
+    """Случайный id из [min(id), max(id)] с повтором при попадании в дырку."""
+
+    def __init__(self, max_retries: int = 3, rng: Optional[random.Random] = None):
+        self.max_retries = max_retries
+        self.rng = rng or random.Random()
+
+    async def id_bounds(self, session: AsyncSession) -> tuple:
+        # Два подзапроса: min и max по отдельности берутся прямо из индекса
+        result = await session.execute(select(
+            select(func.min(User.id)).scalar_subquery(),
+            select(func.max(User.id)).scalar_subquery(),
+        ))
+        return result.one()
+
+    async def pick(self, session: AsyncSession) -> Optional[User]:
+        low, high = await self.id_bounds(session)
+        if low is None:
+            return None
+
+        for _ in range(self.max_retries):
+            result = await session.execute(GET_USER, {"user_id": self.rng.randint(low, high)})
+            user = result.scalars().first()
+            if user is not None:
+                return user
+
+        # Ближайшая следующая строка существует всегда, т.к. probe <= max(id)
+        result = await session.execute(
+            select(User)
+            .where(User.id >= self.rng.randint(low, high))
+            .order_by(User.id)
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def sample_ids(self, session: AsyncSession, n: int) -> List[int]:
+        return await self._probe(session, User.id, n, (), self.rng)
+
+    async def sample(
+        self,
+        session: AsyncSession,
+        n: int,
+        where: Sequence = (),
+        rng: Optional[random.Random] = None,
+    ) -> List[User]:
+        rng = rng or self.rng
+        users = await self._probe(session, User, n, where, rng)
+        if len(users) < n:
+            users.extend(await self._window(session, n - len(users), where, rng, users))
+        return users
+
+    async def _probe(self, session: AsyncSession, entity, n: int, where: Sequence, rng: random.Random) -> list:
+        """Случайные id пачками через WHERE id IN (...); без сортировки таблицы."""
+        low, high = await self.id_bounds(session)
+        if low is None or n <= 0:
+            return []
+
+        span = high - low + 1
+        found, seen = [], set()
+        for _ in range(self.max_retries):
+            wanted = min(span - len(seen), 2 * (n - len(found)))
+            if wanted <= 0:
+                break
+            probes = []
+            while len(probes) < wanted:
+                probe = rng.randint(low, high)
+                if probe not in seen:
+                    seen.add(probe)
+                    probes.append(probe)
+
+            result = await session.execute(select(entity).where(id_in(session, probes), *where))
+            rows = result.scalars().all()
+            by_id = dict(zip(rows, rows)) if entity is User.id else {row.id: row for row in rows}
+            # Порядок результата задаёт rng, а не порядок строк в ответе БД
+            for probe in probes:
+                if probe in by_id:
+                    found.append(by_id[probe])
+                    if len(found) == n:
+                        return found
+        return found
+
+    async def _window(
+        self, session: AsyncSession, n: int, where: Sequence, rng: random.Random, exclude: List[User]
+    ) -> List[User]:
+        """Добор для редких фильтров: n строк подряд от случайной точки, с переходом через конец."""
+        low, high = await self.id_bounds(session)
+        if low is None:
+            return []
+
+        start = rng.randint(low, high)
+        excluded = [user.id for user in exclude]
+        users: List[User] = []
+        for condition in (User.id >= start, User.id < start):
+            query = select(User).where(condition, *where).order_by(User.id).limit(n - len(users))
+            if excluded:
+                query = query.where(User.id.notin_(excluded))
+            result = await session.execute(query)
+            users.extend(result.scalars().all())
+            if len(users) == n:
+                break
+        return users
+
+
+class TableSampleSampler(RandomSampler):
+    """TABLESAMPLE SYSTEM_ROWS на PostgreSQL (расширение tsm_system_rows)."""
+
+    def __init__(self, fallback: Optional[RandomSampler] = None):
+        self.fallback = fallback or IdRangeSampler()
+
+    async def pick(self, session: AsyncSession) -> Optional[User]:
+        if session.bind.dialect.name != "postgresql":
+            return await self.fallback.pick(session)
+
+        result = await session.execute(
+            text("SELECT id FROM users TABLESAMPLE SYSTEM_ROWS(1)").execution_options(readonly=True)
+        )
+        user_id = result.scalar()
+        if user_id is None:
+            return None
+        return await session.get(User, user_id)
+
+
+class ReservoirSampler(RandomSampler):
+    """Пул заранее выбранных id, который пополняется в фоне."""
+
+    def __init__(
+        self,
+        size: int = 1024,
+        low_water: float = 0.25,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        source: Optional[IdRangeSampler] = None,
+    ):
+        self.size = size
+        self.low_water = max(1, int(size * low_water))
+        self.session_factory = session_factory
+        self.source = source or IdRangeSampler()
+        self._ids: deque = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    async def refill(self, session: AsyncSession) -> None:
+        ids = await self.source.sample_ids(session, self.size - len(self._ids))
+        self._ids.extend(ids)
+
+    async def _refill_in_background(self) -> None:
+        try:
+            async with self.session_factory() as session:
+                await self.refill(session)
+        finally:
+            self._refill_task = None
+
+    def _schedule_refill(self) -> None:
+        if self.session_factory is None or self._refill_task is not None:
+            return
+        self._refill_task = asyncio.create_task(self._refill_in_background())
+
+    async def pick(self, session: AsyncSession) -> Optional[User]:
+        for _ in range(self.source.max_retries):
+            if not self._ids:
+                await self.refill(session)
+                if not self._ids:
+                    return None
+
+            user_id = self._ids.popleft()
+            if len(self._ids) < self.low_water:
+                self._schedule_refill()
+
+            user = await session.get(User, user_id)
+            if user is not None:
+                return user
+            # id удалён после выборки — пул устарел
+            self.clear()
+
+        return await self.source.pick(session)
+
+
+def build_sampler(name: str) -> RandomSampler:
+    if name == "order_by_random":
+        return OrderByRandomSampler()
+    if name == "id_range":
+        return IdRangeSampler()
+    if name == "tablesample":
+        return TableSampleSampler()
+    if name == "reservoir":
+        from app.database import async_session
+        sampler = ReservoirSampler(
+            size=settings.RANDOM_RESERVOIR_SIZE,
+            session_factory=async_session,
+        )
+        on_users_changed(sampler.clear)
+        return sampler
+    raise ValueError(f"Unknown random sampler: {name}")
+
+
+_default_sampler: Optional[RandomSampler] = None
+
+
+def get_default_sampler() -> RandomSampler:
+    global _default_sampler
+    if _default_sampler is None:
+        _default_sampler = build_sampler(settings.RANDOM_SAMPLER)
+    return _default_sampler
@@ -0,0 +1,18 @@
+from typing import Sequence
+
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+# Горячие запросы собраны один раз: одинаковый SQL-текст попадает в кэш
+# скомпилированных выражений SQLAlchemy и в кэш prepared statements asyncpg
+GET_USER = select(User).where(User.id == bindparam("user_id"))
+
+
+def id_in(session: AsyncSession, user_ids: Sequence[int]):
+    if session.bind.dialect.name == "postgresql":
+        # Один параметр-массив вместо N плейсхолдеров: текст запроса не зависит от N
+        return User.id == any_(bindparam("user_ids", list(user_ids), type_=ARRAY(Integer)))
+    return User.id.in_(user_ids)
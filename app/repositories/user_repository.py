@@ -1,30 +1,227 @@
-from typing import Optional, List
-from sqlalchemy import select, func
+import random
+import asyncpg
+from dataclasses import dataclass, field
+from typing import Optional, List, Sequence, Tuple
+from sqlalchemy import select, func, insert, literal_column, or_, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.events import notify_users_changed
 from app.models.user import User
+from app.repositories.pagination import Cursor, KeysetPage, NEXT, PREV, decode_cursor, encode_cursor
+from app.repositories.sampling import RandomSampler, get_default_sampler
+from app.repositories.statements import GET_USER, id_in
+
+SEARCH_FIELDS = ("first_name", "last_name", "email")
+ON_CONFLICT_MODES = ("error", "nothing", "update")
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+# id и updated_at заполняет БД
+SERVER_COLUMNS = {"id", "updated_at"}
+USER_COLUMNS = tuple(column.name for column in User.__table__.columns if column.name not in SERVER_COLUMNS)
+# COPY идёт мимо SQLAlchemy: ошибки сервера приходят как asyncpg.PostgresError,
+# ошибки кодирования значений на клиенте — как ValueError (asyncpg DataError)
+ROW_ERRORS = (SQLAlchemyError, asyncpg.PostgresError, ValueError)
+RESERVE_IDS = text("SELECT nextval(pg_get_serial_sequence('users', 'id')) FROM generate_series(1, :n)")
+
+
+@dataclass
+class RowFailure:
+    index: int
+    error: str
+
+
+@dataclass
+class BulkInsertResult:
+    inserted: int = 0
+    inserted_ids: List[int] = field(default_factory=list)
+    failures: List[RowFailure] = field(default_factory=list)
+    duplicates: int = 0
+    # Строки, перезаписанные on_conflict="update"; в inserted и inserted_ids не входят
+    updated: int = 0
+
 
 class UserRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, sampler: Optional[RandomSampler] = None):
         self.session = session
+        self.sampler = sampler or get_default_sampler()
 
     async def create_user(self, user_data: dict) -> User:
         user = User(**user_data)
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        notify_users_changed()
         return user
 
+    async def bulk_create_users(
+        self,
+        users_data: Sequence[dict],
+        chunk_size: Optional[int] = None,
+        method: str = "returning",
+        on_conflict: str = "error",
+    ) -> BulkInsertResult:
+        """Вставляет пачками в одной транзакции; битые строки попадают в failures.
+
+        on_conflict задаёт поведение при совпадении external_id: error — ошибка
+        строки, nothing — строка пропускается, update — существующая строка
+        перезаписывается. Пропущенные строки считаются в duplicates,
+        перезаписанные — в updated. method="copy" работает только с error.
+        """
+        chunk_size = chunk_size or settings.BULK_INSERT_CHUNK_SIZE
+        # COPY не умеет ON CONFLICT
+        if method == "copy" and (self.session.bind.dialect.driver != "asyncpg" or on_conflict != "error"):
+            method = "returning"
+
+        result = BulkInsertResult()
+        try:
+            for start in range(0, len(users_data), chunk_size):
+                await self._insert_chunk(
+                    users_data[start:start + chunk_size], start, method, on_conflict, result
+                )
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        if result.inserted or result.updated:
+            notify_users_changed()
+        return result
+
+    async def _insert_chunk(
+        self, chunk: Sequence[dict], offset: int, method: str, on_conflict: str, result: BulkInsertResult
+    ) -> None:
+        rows, positions = [], []
+        for index, row in enumerate(chunk, start=offset):
+            unknown = set(row) - set(USER_COLUMNS)
+            if unknown:
+                result.failures.append(RowFailure(index, f"Unknown fields: {sorted(unknown)}"))
+                continue
+            rows.append(row)
+            positions.append(index)
+        if on_conflict != "error":
+            rows, positions = self._dedupe(rows, positions, keep_last=on_conflict == "update", result=result)
+        if not rows:
+            return
+
+        try:
+            async with self.session.begin_nested():
+                await self._insert_rows(rows, method, on_conflict, result)
+            return
+        except ROW_ERRORS:
+            pass
+
+        # Пачка не прошла целиком — повторяем построчно, чтобы найти виноватых
+        for index, row in zip(positions, rows):
+            try:
+                async with self.session.begin_nested():
+                    await self._insert_rows([row], "returning", on_conflict, result)
+            except ROW_ERRORS as e:
+                result.failures.append(RowFailure(index, str(getattr(e, "orig", None) or e)))
+
+    @staticmethod
+    def _dedupe(
+        rows: List[dict], positions: List[int], keep_last: bool, result: BulkInsertResult
+    ) -> Tuple[List[dict], List[int]]:
+        """Убирает повторы external_id внутри пачки, чтобы не гонять их через ON CONFLICT.
+
+        PostgreSQL к тому же не даёт одному INSERT ... DO UPDATE изменить строку дважды.
+        """
+        chosen = {}
+        for slot, row in enumerate(rows):
+            key = row.get("external_id")
+            if key is None:
+                chosen[("row", slot)] = slot
+            elif keep_last or key not in chosen:
+                chosen[key] = slot
+        slots = sorted(chosen.values())
+        result.duplicates += len(rows) - len(slots)
+        return [rows[slot] for slot in slots], [positions[slot] for slot in slots]
+
+    def _insert_statement(self, on_conflict: str):
+        upsert_insert = UPSERT_INSERTS.get(self.session.bind.dialect.name)
+        if on_conflict == "error" or upsert_insert is None:
+            return insert(User)
+        statement = upsert_insert(User)
+        if on_conflict == "nothing":
+            return statement.on_conflict_do_nothing(index_elements=[User.external_id])
+        updated = {name: statement.excluded[name] for name in USER_COLUMNS if name != "external_id"}
+        updated["updated_at"] = func.now()
+        return statement.on_conflict_do_update(index_elements=[User.external_id], set_=updated)
+
+    async def _insert_rows(
+        self, rows: List[dict], method: str, on_conflict: str, result: BulkInsertResult
+    ) -> None:
+        if method == "copy":
+            # COPY не умеет RETURNING, поэтому id берутся из последовательности заранее
+            ids = sorted((await self.session.execute(RESERVE_IDS, {"n": len(rows)})).scalars().all())
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                User.__tablename__,
+                records=[(user_id, *(row.get(name) for name in USER_COLUMNS)) for user_id, row in zip(ids, rows)],
+                columns=("id", *USER_COLUMNS),
+            )
+            result.inserted_ids.extend(ids)
+            result.inserted += len(rows)
+            return
+
+        statement = self._insert_statement(on_conflict)
+        if on_conflict == "error":
+            statement = statement.returning(User.id, sort_by_parameter_order=True)
+        elif on_conflict == "update" and self.session.bind.dialect.name == "postgresql":
+            # xmax = 0 только у строк, созданных этим INSERT, а не перезаписанных DO UPDATE
+            statement = statement.returning(User.id, literal_column("xmax = 0"))
+        else:
+            # Пропущенные ON CONFLICT строки не возвращаются, порядок id не сопоставить со входом
+            statement = statement.returning(User.id)
+
+        existing_ids = set()
+        if on_conflict == "update" and self.session.bind.dialect.name != "postgresql":
+            keys = [row["external_id"] for row in rows if row.get("external_id") is not None]
+            if keys:
+                existing_ids = set((await self.session.execute(
+                    select(User.id).where(User.external_id.in_(keys))
+                )).scalars())
+
+        returned = (await self.session.execute(statement, rows)).all()
+        if on_conflict == "update" and self.session.bind.dialect.name == "postgresql":
+            ids = [user_id for user_id, created in returned if created]
+        else:
+            ids = [row[0] for row in returned if row[0] not in existing_ids]
+        result.inserted_ids.extend(ids)
+        result.inserted += len(ids)
+        if on_conflict == "nothing":
+            result.duplicates += len(rows) - len(ids)
+        elif on_conflict == "update":
+            result.updated += len(returned) - len(ids)
+
     async def get_user(self, user_id: int) -> Optional[User]:
-        result = await self.session.execute(
-            select(User).where(User.id == user_id)
-        )
+        result = await self.session.execute(GET_USER, {"user_id": user_id})
         return result.scalars().first()
 
-    async def get_random_user(self) -> Optional[User]:
+    async def get_users_by_ids(self, user_ids: Sequence[int]) -> List[User]:
+        """Один запрос на все id; порядок строк не гарантируется."""
+        if not user_ids:
+            return []
+        result = await self.session.execute(select(User).where(id_in(self.session, user_ids)))
+        return result.scalars().all()
+
+    async def get_picture_url(self, picture_hash: str) -> Optional[str]:
         result = await self.session.execute(
-            select(User).order_by(func.random()).limit(1)
+            select(User.picture_url).where(User.picture_hash == picture_hash).limit(1)
         )
-        return result.scalars().first()
+        return result.scalar()
+
+    async def get_random_user(self) -> Optional[User]:
+        return await self.sampler.pick(self.session)
+
+    async def get_random_users(
+        self, n: int, gender: Optional[str] = None, seed: Optional[int] = None
+    ) -> List[User]:
+        """n разных случайных пользователей; с seed выборка воспроизводима."""
+        where = [User.gender == gender] if gender else []
+        rng = random.Random(seed) if seed is not None else None
+        return await self.sampler.sample(self.session, n, where, rng)
 
     async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         result = await self.session.execute(
@@ -32,6 +229,79 @@ class UserRepository:
         )
         return result.scalars().all()
 
+    async def get_users_page(
+        self, limit: int = 20, cursor: Optional[str] = None, offset: int = 0, where: Sequence = ()
+    ) -> KeysetPage:
+        """Keyset-пагинация по id; offset нужен только для старых ссылок ?page=N."""
+        position = decode_cursor(cursor) if cursor else None
+        query = select(User).where(*where).limit(limit + 1)
+
+        if position is None:
+            page = offset // limit + 1
+            query = query.order_by(User.id).offset(offset)
+        elif position.direction == NEXT:
+            page = position.page
+            query = query.where(User.id > position.id).order_by(User.id)
+        else:
+            page = position.page
+            query = query.where(User.id < position.id).order_by(User.id.desc())
+
+        result = await self.session.execute(query)
+        users = list(result.scalars().all())
+        has_more = len(users) > limit
+        users = users[:limit]
+
+        if position is not None and position.direction == PREV:
+            users.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, position is not None or offset > 0
+
+        return KeysetPage(
+            items=users,
+            next_cursor=encode_cursor(Cursor(NEXT, users[-1].id, page + 1)) if users and has_next else None,
+            prev_cursor=encode_cursor(Cursor(PREV, users[0].id, page - 1)) if users and has_prev else None,
+            page=page,
+        )
+
+    async def search_users(
+        self,
+        query: Optional[str] = None,
+        fields: Sequence[str] = SEARCH_FIELDS,
+        mode: str = "prefix",
+        gender: Optional[str] = None,
+        country: Optional[str] = None,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> KeysetPage:
+        where = []
+        if query:
+            escaped = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            if mode == "prefix":
+                # lower(col) LIKE 'q%' попадает в индексы ix_users_*_lower
+                where.append(or_(*(
+                    func.lower(getattr(User, name)).like(f"{escaped}%", escape="\\")
+                    for name in fields
+                )))
+            else:
+                # На PostgreSQL ILIKE '%q%' обслуживают GIN-индексы pg_trgm
+                where.append(or_(*(
+                    getattr(User, name).ilike(f"%{escaped}%", escape="\\")
+                    for name in fields
+                )))
+        if gender:
+            where.append(User.gender == gender)
+        if country:
+            where.append(User.country == country)
+        # country/state/city покрывает индекс ix_users_location
+        if state:
+            where.append(User.state == state)
+        if city:
+            where.append(User.city == city)
+        return await self.get_users_page(limit=limit, cursor=cursor, where=where)
+
     async def count_users(self) -> int:
         result = await self.session.execute(select(func.count(User.id)))
-        return result.scalar()
\ No newline at end of file
+        return result.scalar()
@@ -1,29 +1,219 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
-from app.repositories.user_repository import UserRepository
-from app.schemas.user import User
-from app.database import get_db
+from typing import Annotated, List, Literal, Optional, Union
+from sqlalchemy.orm import sessionmaker
+from app.repositories.cached_user_repository import CachedUserRepository
+from app.repositories.user_repository import SEARCH_FIELDS, UserRepository
+from app.config import settings
+from app.http_cache import cached_version, conditional_response
+from app.schemas.user import ImportSummary, JobStatus, User, UserBatch, UserBatchRequest, UserPage
+from app.services.backfill import backfill_locations
+from app.services.dedup import dedup_users
+from app.services.jobs import Job, job_manager
+from app.services.reset import RESET_MODES, resolve_mode, run_reset_job
+from app.database import get_db, get_session_factory
+from app.services.export import MEDIA_TYPES, export_users
+from app.services.importer import ImportTooLarge, import_users
+from app.serialization import FastJSONResponse, dumps, page_to_dict, user_to_dict, users_to_list
 
-router = APIRouter()
+# response_model остаётся для OpenAPI, а горячие маршруты отдают FastJSONResponse
+# напрямую и не проходят повторную валидацию
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.get("/random", response_model=User)
+@router.get("/random", response_model=Union[User, List[User]])
 async def random_user(
-    db: Annotated[AsyncSession, Depends(get_db)]
-) -> User:
+    db: Annotated[AsyncSession, Depends(get_db)],
+    n: Annotated[Optional[int], Query(ge=1)] = None,
+    gender: Optional[str] = None,
+    seed: Optional[int] = None
+) -> Response:
     repo = UserRepository(db)
-    user = await repo.get_random_user()
-    if not user:
-        raise HTTPException(status_code=404, detail="No users found")
-    return user
+    if n is None and gender is None and seed is None:
+        user = await repo.get_random_user()
+        if not user:
+            raise HTTPException(status_code=404, detail="No users found")
+        return FastJSONResponse(user_to_dict(user))
+
+    if n is not None and n > settings.RANDOM_SAMPLE_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RANDOM_SAMPLE_MAX} users per sample"
+        )
+    users = await repo.get_random_users(n or 1, gender=gender, seed=seed)
+    if n is None:
+        if not users:
+            raise HTTPException(status_code=404, detail="No users found")
+        return FastJSONResponse(user_to_dict(users[0]))
+    return FastJSONResponse(users_to_list(users))
+
+async def lookup_batch(db: AsyncSession, user_ids: List[int]) -> Response:
+    # Дубликаты убираем, сохраняя порядок запроса
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request"
+        )
+
+    repo = CachedUserRepository(db)
+    found = {user.id: user for user in await repo.get_users_by_ids(user_ids)}
+    return FastJSONResponse({
+        "items": users_to_list(found[user_id] for user_id in user_ids if user_id in found),
+        "missing": [user_id for user_id in user_ids if user_id not in found]
+    })
+
+@router.get("/users", response_model=Union[UserBatch, UserPage])
+async def list_users(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    ids: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20
+) -> Response:
+    if ids is not None:
+        try:
+            user_ids = [int(user_id) for user_id in ids.split(",") if user_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        return await lookup_batch(db, user_ids)
+
+    repo = UserRepository(db)
+    try:
+        page = await repo.get_users_page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page_to_dict(page))
+
+@router.get("/users/search", response_model=UserPage)
+async def search_users(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    q: Annotated[Optional[str], Query(max_length=100)] = None,
+    fields: Annotated[List[Literal["first_name", "last_name", "email"]], Query()] = list(SEARCH_FIELDS),
+    mode: Literal["prefix", "substring"] = "prefix",
+    gender: Optional[str] = None,
+    country: Optional[str] = None,
+    state: Optional[str] = None,
+    city: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20
+) -> Response:
+    repo = UserRepository(db)
+    try:
+        page = await repo.search_users(
+            q, fields=fields, mode=mode, gender=gender, country=country,
+            state=state, city=city, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page_to_dict(page))
+
+@router.get("/users/export")
+async def export_users_endpoint(
+    session_factory: Annotated[sessionmaker, Depends(get_session_factory)],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    after_id: Annotated[int, Query(ge=0)] = 0
+) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="users.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_users(session_factory, format, after_id=after_id, gzip=gzip),
+        media_type=MEDIA_TYPES[format],
+        headers=headers
+    )
+
+@router.post("/users/import", response_model=ImportSummary)
+async def import_users_endpoint(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    format: Literal["ndjson", "csv"] = "ndjson"
+) -> ImportSummary:
+    # Тело читается потоком: в памяти не больше одной пачки IMPORT_BATCH_SIZE
+    gzip = request.headers.get("content-encoding") == "gzip"
+    try:
+        return await import_users(UserRepository(db), request.stream(), format, gzip=gzip)
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@router.post("/users/batch", response_model=UserBatch)
+async def batch_users(
+    request: UserBatchRequest,
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> Response:
+    return await lookup_batch(db, request.ids)
+
+async def run_backfill_job(job: Job, session_factory: sessionmaker) -> None:
+    async def backfill(job: Job) -> dict:
+        def report(scanned: int) -> None:
+            job.progress = scanned
+
+        return await backfill_locations(session_factory, on_progress=report)
+
+    await job_manager.run(job, backfill, session_factory)
+
+@router.post("/users/location/backfill", response_model=JobStatus, status_code=202)
+async def backfill_location(
+    background_tasks: BackgroundTasks,
+    session_factory: Annotated[sessionmaker, Depends(get_session_factory)]
+) -> JobStatus:
+    job = await job_manager.create(session_factory, "backfill_location")
+    background_tasks.add_task(run_backfill_job, job, session_factory)
+    return job
+
+async def run_dedup_job(job: Job, session_factory: sessionmaker) -> None:
+    async def dedup(job: Job) -> dict:
+        def report(scanned: int) -> None:
+            job.progress = scanned
+
+        return await dedup_users(session_factory, on_progress=report)
+
+    await job_manager.run(job, dedup, session_factory)
+
+@router.post("/users/dedup", response_model=JobStatus, status_code=202)
+async def dedup_users_endpoint(
+    background_tasks: BackgroundTasks,
+    session_factory: Annotated[sessionmaker, Depends(get_session_factory)]
+) -> JobStatus:
+    job = await job_manager.create(session_factory, "dedup_users")
+    background_tasks.add_task(run_dedup_job, job, session_factory)
+    return job
+
+@router.post("/users/reset", response_model=JobStatus, status_code=202)
+async def reset_users_endpoint(
+    background_tasks: BackgroundTasks,
+    session_factory: Annotated[sessionmaker, Depends(get_session_factory)],
+    mode: Literal[RESET_MODES] = "auto"
+) -> JobStatus:
+    try:
+        resolve_mode(mode, session_factory.kw["bind"].dialect.name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = await job_manager.create(session_factory, "reset_users")
+    background_tasks.add_task(run_reset_job, job, session_factory, mode)
+    return job
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def read_job(job_id: str, db: Annotated[AsyncSession, Depends(get_db)]) -> JobStatus:
+    job = await job_manager.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @router.get("/{user_id}", response_model=User)
 async def read_user(
     user_id: int,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)]
-) -> User:
-    repo = UserRepository(db)
+) -> Response:
+    key = ("api", user_id)
+    not_modified = cached_version(request, key)
+    if not_modified is not None:
+        return not_modified
+
+    repo = CachedUserRepository(db)
     user = await repo.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    body = dumps(user_to_dict(user))
+    return conditional_response(request, key, body, "application/json", user.updated_at)
\ No newline at end of file
@@ -1,71 +1,114 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Form
-from fastapi.templating import Jinja2Templates
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, text
-from app.models.user import User
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.http_cache import cached_version, conditional_response
+from app.repositories.counting import get_user_counter
+from app.repositories.cached_user_repository import CachedUserRepository
 from app.repositories.user_repository import UserRepository
+from app.services.jobs import Job, job_manager
 from app.services.random_user_service import RandomUserService
-from app.database import get_db
+from app.services.reset import run_reset_job
+from app.database import get_db, get_session_factory
+from app.templating import get_page_cache, templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/", response_class=HTMLResponse)
-async def read_root(request: Request, page: int = 1, db: AsyncSession = Depends(get_db)):
+async def read_root(
+    request: Request,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    job: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # Страница со статусом задачи меняется без записи в users, её не кэшируем
+    page_cache = get_page_cache() if job is None else None
+    key = ("index", cursor) if cursor else ("index", max(page, 1))
+    if page_cache is not None:
+        cached = page_cache.get(key)
+        if cached is not None:
+            return HTMLResponse(cached[0])
+
     repo = UserRepository(db)
     per_page = 20
-    total_users = await repo.count_users()
-    users = await repo.get_users(skip=(page - 1) * per_page, limit=per_page)
+    total_users = await get_user_counter().count(db)
+    try:
+        # ?page=N оставлен для старых ссылок, дальше навигация идёт по курсорам
+        users_page = await repo.get_users_page(
+            limit=per_page, cursor=cursor, offset=(max(page, 1) - 1) * per_page
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return templates.TemplateResponse(request, "index.html", {
-        "users": users,
-        "page": page,
-        "total_pages": (total_users + per_page - 1) // per_page
+    response = templates.TemplateResponse(request, "index.html", {
+        "users": users_page.items,
+        "page": users_page.page,
+        "next_cursor": users_page.next_cursor,
+        "prev_cursor": users_page.prev_cursor,
+        "total_pages": (total_users + per_page - 1) // per_page,
+        "job": await job_manager.get(db, job) if job else None
     })
+    if page_cache is not None:
+        page_cache.set(key, response.body)
+    return response
+
+
+async def render_index_error(request: Request, db: AsyncSession, error: str):
+    # Для страницы ошибки достаточно первой страницы таблицы
+    per_page = 20
+    repo = UserRepository(db)
+    total_users = await get_user_counter().count(db)
+    users_page = await repo.get_users_page(limit=per_page)
+    return templates.TemplateResponse(request, "index.html",
+        {
+            "error": error,
+            "users": users_page.items,
+            "page": users_page.page,
+            "next_cursor": users_page.next_cursor,
+            "prev_cursor": users_page.prev_cursor,
+            "total_pages": max(1, (total_users + per_page - 1) // per_page)
+        },
+        status_code=400
+    )
+
+
+async def run_load_users_job(job: Job, count: int, session_factory: sessionmaker) -> None:
+    async def ingest(job: Job) -> dict:
+        async with session_factory() as session:
+            service = RandomUserService(UserRepository(session))
+
+            def report(result):
+                job.progress = result.inserted + result.updated + result.duplicates + len(result.failures)
+
+            result = await service.load_users(count, on_progress=report)
+            return {
+                "inserted": result.inserted,
+                "duplicates": result.duplicates,
+                "updated": result.updated,
+                "failed": len(result.failures)
+            }
+
+    await job_manager.run(job, ingest, session_factory)
 
 
 @router.post("/load-users")
 async def load_users(
         request: Request,
+        background_tasks: BackgroundTasks,
         count: int = Form(...),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_db),
+        session_factory: sessionmaker = Depends(get_session_factory)
 ):
-    repo = UserRepository(db)
-    
-    users = await repo.get_users()
-    per_page = 10
-    current_page = 1
-    total_pages = max(1, (len(users) + per_page - 1) // per_page)
-    
     if count < 1 or count > 5000:
-        return templates.TemplateResponse(request, "index.html",
-            {
-                "error": "Count must be between 1 and 5000",
-                "users": users[:per_page],
-                "page": current_page,
-                "total_pages": total_pages
-            },
-            status_code=400
-        )
-
-    try:
-        service = RandomUserService(repo)
-        await service.load_users(count)
-        return RedirectResponse(url="/", status_code=303)
-    
-    except Exception as e:
-        return templates.TemplateResponse(request, "index.html",
-            {
-                "error": str(e),
-                "users": users[:per_page],
-                "page": current_page,
-                "total_pages": total_pages
-            },
-            status_code=400
-        )
+        return await render_index_error(request, db, "Count must be between 1 and 5000")
 
+    job = await job_manager.create(session_factory, "load_users", total=count)
+    background_tasks.add_task(run_load_users_job, job, count, session_factory)
+    return RedirectResponse(url=f"/?job={job.id}", status_code=303)
 
 
 @router.get("/random", response_class=HTMLResponse)
@@ -77,29 +120,37 @@ async def random_user(request: Request, db: AsyncSession = Depends(get_db)):
     return templates.TemplateResponse(request, "user_detail.html", {"user": user})
 
 
-@router.get("/admin/clear")
-async def clear_users_table(db: AsyncSession = Depends(get_db)):
-    try:
-        await db.execute(text("TRUNCATE TABLE users RESTART IDENTITY CASCADE"))
-        await db.commit()
-        
-        return RedirectResponse(
-            url="/?message=Clear_DB",
-            status_code=303
-        )
-    except Exception as e:
-        await db.rollback()
-        return RedirectResponse(
-            url=f"/?error=Clear+failed:{str(e).replace(' ', '+')}",
-            status_code=303
-        )
+@router.api_route("/admin/clear", methods=["GET", "POST"])
+async def clear_users_table(
+        background_tasks: BackgroundTasks,
+        session_factory: sessionmaker = Depends(get_session_factory)
+):
+    # Очистка идёт фоновой задачей, прогресс — на главной странице
+    job = await job_manager.create(session_factory, "reset_users")
+    background_tasks.add_task(run_reset_job, job, session_factory, settings.RESET_MODE)
+    return RedirectResponse(url=f"/?job={job.id}", status_code=303)
+
 
 @router.get("/{user_id}", response_class=HTMLResponse)
 async def read_user(user_id: int, request: Request, db: AsyncSession = Depends(get_db)):
-    repo = UserRepository(db)
-    user = await repo.get_user(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return templates.TemplateResponse(request, "user_detail.html", {"user": user})
+    key = ("html", user_id)
+    not_modified = cached_version(request, key)
+    if not_modified is not None:
+        return not_modified
+
+    page_cache = get_page_cache()
+    cached = page_cache.get(key) if page_cache is not None else None
+    if cached is not None:
+        body, updated_at = cached
+    else:
+        repo = CachedUserRepository(db)
+        user = await repo.get_user(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        body = templates.TemplateResponse(request, "user_detail.html", {"user": user}).body
+        updated_at = user.updated_at
+        if page_cache is not None:
+            page_cache.set(key, body, updated_at)
+    return conditional_response(request, key, body, "text/html", updated_at)
 
 
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.database import get_pool_stats
+from app.metrics import CONTENT_TYPE, DB_POOL_CONNECTIONS, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    # Состояние пула снимается в момент опроса, а не на каждом checkout
+    stats = get_pool_stats()
+    for state in ("checked_out", "checked_in", "overflow"):
+        DB_POOL_CONNECTIONS.set(stats[state], state)
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
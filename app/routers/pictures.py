@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.http_cache import etag_matches
+from app.repositories.user_repository import UserRepository
+from app.services.pictures import get_picture_store, sniff_media_type
+
+router = APIRouter()
+
+
+async def redirect_to_original(picture_hash: str, db: AsyncSession) -> RedirectResponse:
+    picture_url = await UserRepository(db).get_picture_url(picture_hash)
+    if picture_url is None:
+        raise HTTPException(status_code=404, detail="Picture not found")
+    return RedirectResponse(picture_url, status_code=status.HTTP_302_FOUND)
+
+
+@router.get("/pictures/{picture_hash}")
+async def read_picture(picture_hash: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """Локальная копия миниатюры; содержимое по хэшу не меняется, поэтому кэш вечный."""
+    store = get_picture_store()
+    path = store.get(picture_hash) if store is not None else None
+    if path is None:
+        # Файл вытеснен или кэш выключен — отправляем к оригиналу
+        return await redirect_to_original(picture_hash, db)
+
+    etag = f'"{picture_hash}"'
+    headers = {"ETag": etag, "Cache-Control": settings.PICTURE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        with path.open("rb") as picture:
+            media_type = sniff_media_type(picture.read(12))
+    except FileNotFoundError:
+        # Вытеснен между store.get и открытием
+        return await redirect_to_original(picture_hash, db)
+    # FileResponse отдаёт файл через sendfile, если сервер это поддерживает
+    return FileResponse(path, media_type=media_type, headers=headers)
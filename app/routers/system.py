@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db, get_pool_stats
+from app.http_cache import get_version_map
+from app.repositories.cached_user_repository import get_user_cache
+from app.schemas.user import JobStatus
+from app.services.seeding import get_seed_job
+from app.templating import get_page_cache
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def cache_stats() -> dict:
+    cache = get_user_cache()
+    pages = get_page_cache()
+    return {
+        "users": cache.stats() if cache is not None else None,
+        "pages": {
+            "size": len(pages),
+            "bytes": pages.size,
+            "hits": pages.stats.hits,
+            "misses": pages.stats.misses,
+            "evictions": pages.stats.evictions,
+        } if pages is not None else None,
+        "http_versions": get_version_map().stats(),
+    }
+
+
+@router.get("/pool")
+async def pool_stats() -> dict:
+    return get_pool_stats()
+
+
+@router.get("/ready")
+async def readiness(response: Response, db: AsyncSession = Depends(get_db)) -> dict:
+    """Готовность принимать трафик; сидирование в фоне её не блокирует."""
+    try:
+        await db.execute(text("SELECT 1"))
+        database = "ok"
+    except (SQLAlchemyError, OSError):
+        database = "unavailable"
+        response.status_code = 503
+
+    job = get_seed_job()
+    return {
+        "ready": database == "ok",
+        "database": database,
+        "seeding": JobStatus.model_validate(job).model_dump() if job is not None else None,
+    }
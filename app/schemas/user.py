@@ -1,18 +1,83 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, model_validator
+from app.location import format_location, has_location
 
 class UserBase(BaseModel):
+    external_id: Optional[str] = None
     gender: str
     first_name: str
     last_name: str
     email: str
     phone: str
+    country: Optional[str] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    street_number: Optional[int] = None
+    street_name: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 class UserCreate(UserBase):
-    location: str
+    location: Optional[str] = None
     picture_url: str
 
 class User(UserBase):
     id: int
-    location: str
+    location: Optional[str] = None
     picture_url: str
+    # Заполняется только сервером при скачивании миниатюры
+    picture_hash: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="after")
+    def fill_location(self) -> "User":
+        # Строка location для старых клиентов собирается из колонок адреса
+        if self.location is None and has_location(self):
+            self.location = format_location(
+                country=self.country, state=self.state, city=self.city,
+                street_number=self.street_number, street_name=self.street_name,
+            )
+        return self
+
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int]
+
+
+class UserBatch(BaseModel):
+    items: List[User]
+    missing: List[int]
+
+
+class RowError(BaseModel):
+    index: int
+    error: str
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImportSummary(BaseModel):
+    accepted: int
+    rejected: int
+    duplicates: int = 0
+    updated: int = 0
+    errors: List[RowError]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Быстрый путь JSON-ответов API.
+
+Строки из БД и объекты из кэша пользователей уже соответствуют схеме User,
+поэтому повторная валидация через response_model не нужна: словари
+собираются напрямую из атрибутов и сериализуются orjson.
+"""
+from typing import Any, Iterable, List
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.location import format_location, has_location
+from app.repositories.pagination import KeysetPage
+from app.schemas.user import User
+
+USER_FIELDS = tuple(User.model_fields)
+
+
+def dumps(content: Any) -> bytes:
+    # OPT_UTC_Z — как у pydantic: UTC-время с суффиксом Z
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def user_to_dict(user: Any) -> dict:
+    """ORM-строка или закэшированная схема User -> словарь ответа без валидации."""
+    # Загруженные колонки лежат в __dict__ и у ORM-объекта, и у модели pydantic;
+    # дескрипторы SQLAlchemy обходим, getattr нужен только для expired-атрибутов
+    values = user.__dict__
+    data = {name: values[name] if name in values else getattr(user, name) for name in USER_FIELDS}
+    if data["location"] is None and has_location(data):
+        data["location"] = format_location(
+            country=data["country"], state=data["state"], city=data["city"],
+            street_number=data["street_number"], street_name=data["street_name"],
+        )
+    return data
+
+
+def users_to_list(users: Iterable[Any]) -> List[dict]:
+    return [user_to_dict(user) for user in users]
+
+
+def page_to_dict(page: KeysetPage) -> dict:
+    return {
+        "items": users_to_list(page.items),
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
@@ -0,0 +1,62 @@
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.events import notify_users_changed
+from app.location import LOCATION_FIELDS, parse_location
+from app.models.user import User
+
+STRUCTURED_COLUMNS = [getattr(User, name) for name in LOCATION_FIELDS[:5]]
+
+
+async def backfill_locations(
+    session_factory: sessionmaker,
+    batch_size: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> dict:
+    """Переносит старую строку location в колонки адреса пачками по id.
+
+    Каждая пачка — отдельная транзакция, так что прерванный backfill
+    можно перезапустить: обработанные строки уже не содержат location.
+    """
+    batch_size = batch_size or settings.LOCATION_BACKFILL_BATCH_SIZE
+    last_id, scanned, updated = 0, 0, 0
+
+    while True:
+        async with session_factory() as session:
+            result = await session.execute(
+                select(User.id, User.location, *STRUCTURED_COLUMNS)
+                .where(User.id > last_id, User.location.is_not(None))
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            changes = []
+            for row in rows:
+                parsed = parse_location(row.location)
+                if not parsed:
+                    # Произвольный текст оставляем как есть: его отдаст поле location
+                    continue
+                values = {"id": row.id, "location": None}
+                for name, value in parsed.items():
+                    # Уже заполненные колонки важнее разобранной строки
+                    values[name] = getattr(row, name) if getattr(row, name) is not None else value
+                changes.append(values)
+
+            if changes:
+                await session.execute(update(User), changes)
+                await session.commit()
+                notify_users_changed()
+
+        last_id = rows[-1].id
+        scanned += len(rows)
+        updated += len(changes)
+        if on_progress is not None:
+            on_progress(scanned)
+
+    return {"scanned": scanned, "updated": updated}
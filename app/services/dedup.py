@@ -0,0 +1,71 @@
+from typing import Callable, Optional
+
+from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy.orm import aliased, sessionmaker
+
+from app.config import settings
+from app.events import notify_users_changed
+from app.models.user import User
+from app.repositories.statements import id_in
+
+
+def duplicate_of(original, candidate):
+    """Условие «candidate — лишняя копия original».
+
+    Повторы external_id исключает уникальный индекс, поэтому удаляются только
+    строки без него: копия ищется по email (индекс ix_users_email_lower),
+    имени и телефону. Строка с external_id всегда важнее старой строки,
+    среди старых остаётся самая ранняя.
+    """
+    return and_(
+        candidate.external_id.is_(None),
+        original.id != candidate.id,
+        or_(original.external_id.is_not(None), original.id < candidate.id),
+        func.lower(original.email) == func.lower(candidate.email),
+        original.first_name.is_not_distinct_from(candidate.first_name),
+        original.last_name.is_not_distinct_from(candidate.last_name),
+        original.phone.is_not_distinct_from(candidate.phone),
+    )
+
+
+async def dedup_users(
+    session_factory: sessionmaker,
+    batch_size: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> dict:
+    """Удаляет повторы пользователей (см. duplicate_of).
+
+    Таблица проходится окнами по id, каждое окно — отдельная транзакция,
+    поэтому задачу можно прервать и запустить снова.
+    """
+    batch_size = batch_size or settings.DEDUP_BATCH_SIZE
+    original = aliased(User)
+    last_id, scanned, deleted = 0, 0, 0
+
+    while True:
+        async with session_factory() as session:
+            window = (await session.execute(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            )).scalars().all()
+            if not window:
+                break
+
+            duplicates = (await session.execute(
+                select(User.id)
+                .where(User.id > last_id, User.id <= window[-1])
+                .where(exists().where(duplicate_of(original, User)))
+            )).scalars().all()
+            if duplicates:
+                await session.execute(
+                    delete(User).where(id_in(session, duplicates)).execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                notify_users_changed()
+
+        last_id = window[-1]
+        scanned += len(window)
+        deleted += len(duplicates)
+        if on_progress is not None:
+            on_progress(scanned)
+
+    return {"scanned": scanned, "deleted": deleted}
@@ -0,0 +1,111 @@
+import asyncio
+import csv
+import io
+import json
+import zlib
+from contextlib import suppress
+from typing import AsyncIterator, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.user import User
+from app.repositories.user_repository import USER_COLUMNS
+
+EXPORT_COLUMNS = ("id",) + USER_COLUMNS
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def iter_user_chunks(session_factory: sessionmaker, after_id: int = 0) -> AsyncIterator[List[tuple]]:
+    """Серверный курсор: в памяти одновременно только один chunk строк."""
+    columns = [User.__table__.c[name] for name in EXPORT_COLUMNS]
+    query = (
+        select(*columns)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    )
+    async with session_factory() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+
+async def iter_ndjson(chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode()
+
+
+async def iter_csv(chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def iter_copy_csv(session_factory: sessionmaker, after_id: int = 0) -> AsyncIterator[bytes]:
+    """COPY ... TO STDOUT через asyncpg: PostgreSQL сам формирует CSV."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    query = (
+        f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {User.__tablename__} "
+        f"WHERE id > $1 ORDER BY id"
+    )
+
+    async def copy() -> None:
+        try:
+            async with session_factory() as session:
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_from_query(
+                    query, after_id, output=queue.put, format="csv", header=True
+                )
+        except asyncio.CancelledError:
+            # Клиент отключился: очередь никто не читает, put на полной очереди повис бы
+            raise
+        except BaseException:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    task = asyncio.create_task(copy())
+    try:
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            # Дожидаемся отмены, чтобы соединение вернулось в пул
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+async def gzip_stream(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in stream:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_users(
+    session_factory: sessionmaker, export_format: str, after_id: int = 0, gzip: bool = False
+) -> AsyncIterator[bytes]:
+    if export_format == "csv" and session_factory.kw["bind"].dialect.driver == "asyncpg":
+        stream = iter_copy_csv(session_factory, after_id)
+    elif export_format == "csv":
+        stream = iter_csv(iter_user_chunks(session_factory, after_id))
+    else:
+        stream = iter_ndjson(iter_user_chunks(session_factory, after_id))
+    return gzip_stream(stream) if gzip else stream
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий клиент с пулом соединений для всех запросов к внешним API."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # Соединения пула привязаны к циклу событий, в котором были открыты
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=settings.HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -0,0 +1,154 @@
+import codecs
+import csv
+import json
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Tuple
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.repositories.user_repository import RowFailure, UserRepository
+from app.schemas.user import UserCreate
+
+REQUIRED_FIELDS = {name for name, info in UserCreate.model_fields.items() if info.is_required()}
+# Сколько распакованных байт отдаёт один вызов decompress
+GUNZIP_CHUNK_SIZE = 64 * 1024
+
+
+class ImportTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    accepted: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    updated: int = 0
+    errors: List[RowFailure] = field(default_factory=list)
+
+    def reject(self, index: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append(RowFailure(index, error))
+
+
+async def gunzip(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    # Маленькое тело может распаковаться в гигабайты: читаем кусками и считаем итог
+    decompressor = zlib.decompressobj(wbits=31)
+    total = 0
+    async for chunk in chunks:
+        data = chunk
+        while data:
+            output = decompressor.decompress(data, GUNZIP_CHUNK_SIZE)
+            total += len(output)
+            if total > max_bytes:
+                raise ImportTooLarge(f"Decompressed body exceeds {max_bytes} bytes")
+            yield output
+            data = decompressor.unconsumed_tail
+    output = decompressor.flush()
+    if total + len(output) > max_bytes:
+        raise ImportTooLarge(f"Decompressed body exceeds {max_bytes} bytes")
+    yield output
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+    async for chunk in chunks:
+        *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    index = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        index += 1
+        try:
+            yield index, json.loads(line)
+        except ValueError as e:
+            yield index, e
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    header = None
+    record = ""
+    index = 0
+    async for line in lines:
+        record += line
+        # Поле в кавычках может содержать перевод строки: запись закончена,
+        # только когда число кавычек чётное
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        index += 1
+        if len(values) != len(header):
+            yield index, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+        else:
+            # В CSV NULL выгружается пустой строкой
+            yield index, {
+                name: value for name, value in zip(header, values)
+                if value != "" or name in REQUIRED_FIELDS
+            }
+
+
+async def import_users(
+    repository: UserRepository,
+    chunks: AsyncIterator[bytes],
+    import_format: str = "ndjson",
+    gzip: bool = False,
+) -> ImportResult:
+    if gzip:
+        chunks = gunzip(chunks, settings.IMPORT_MAX_DECOMPRESSED_BYTES)
+    lines = iter_lines(chunks)
+    records = iter_csv_records(lines) if import_format == "csv" else iter_ndjson_records(lines)
+    method = "copy" if repository.session.bind.dialect.driver == "asyncpg" else "returning"
+
+    result = ImportResult()
+    batch, positions = [], []
+
+    async def flush() -> None:
+        inserted = await repository.bulk_create_users(
+            batch, method=method, on_conflict=settings.INGEST_ON_CONFLICT
+        )
+        result.accepted += inserted.inserted
+        result.duplicates += inserted.duplicates
+        result.updated += inserted.updated
+        for failure in inserted.failures:
+            result.reject(positions[failure.index], failure.error)
+        batch.clear()
+        positions.clear()
+
+    async for index, record in records:
+        if isinstance(record, Exception):
+            result.reject(index, str(record))
+            continue
+        if not isinstance(record, dict):
+            result.reject(index, "Record must be an object")
+            continue
+        record.pop("id", None)
+        try:
+            batch.append(UserCreate(**record).model_dump())
+        except (ValidationError, TypeError) as e:
+            result.reject(index, str(e))
+            continue
+        positions.append(index)
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+    return result
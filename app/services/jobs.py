@@ -0,0 +1,119 @@
+import asyncio
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.job import JobRecord
+
+PENDING = "pending"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = PENDING
+    progress: int = 0
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+
+class JobManager:
+    """Реестр фоновых задач.
+
+    Задача выполняется в том воркере, который её создал, и там же меняет
+    progress; состояние копируется в таблицу jobs, чтобы статус видели
+    остальные воркеры. Прогресс пишется не чаще раза в progress_interval.
+    """
+
+    def __init__(self, progress_interval: Optional[float] = None):
+        self.progress_interval = progress_interval
+        self._running: Dict[str, Job] = {}
+
+    async def create(self, session_factory: sessionmaker, kind: str, total: Optional[int] = None) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, total=total)
+        async with session_factory() as session:
+            await session.execute(
+                delete(JobRecord).where(JobRecord.created_at < job.created_at - settings.JOB_RETENTION_SECONDS)
+            )
+            session.add(JobRecord(**asdict(job)))
+            await session.commit()
+        self._running[job.id] = job
+        return job
+
+    async def get(self, session: AsyncSession, job_id: str) -> Optional[Job]:
+        job = self._running.get(job_id)
+        if job is not None:
+            return job
+        # Только что созданная задача может ещё не доехать до реплики
+        record = (await session.execute(
+            select(JobRecord).where(JobRecord.id == job_id).execution_options(primary=True)
+        )).scalar_one_or_none()
+        if record is None:
+            return None
+        return Job(**{column.name: getattr(record, column.name) for column in JobRecord.__table__.columns})
+
+    async def run(
+        self,
+        job: Job,
+        func: Callable[[Job], Awaitable[Optional[Dict[str, Any]]]],
+        session_factory: sessionmaker,
+    ) -> None:
+        job.status = RUNNING
+        await self._save(session_factory, job)
+        done = asyncio.Event()
+        saver = asyncio.create_task(self._save_progress(session_factory, job, done, (job.progress, job.total)))
+        try:
+            job.result = await func(job)
+            job.status = FINISHED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            done.set()
+            await saver
+            await self._save(session_factory, job)
+            self._running.pop(job.id, None)
+
+    async def _save_progress(
+        self, session_factory: sessionmaker, job: Job, done: asyncio.Event, saved: Tuple[int, Optional[int]]
+    ) -> None:
+        interval = self.progress_interval or settings.JOB_PROGRESS_INTERVAL
+        while not done.is_set():
+            try:
+                await asyncio.wait_for(done.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            if done.is_set() or (job.progress, job.total) == saved:
+                continue
+            saved = (job.progress, job.total)
+            try:
+                await self._save(session_factory, job)
+            except SQLAlchemyError:
+                # Промежуточный прогресс не стоит того, чтобы ронять задачу
+                pass
+
+    @staticmethod
+    async def _save(session_factory: sessionmaker, job: Job) -> None:
+        state = asdict(job)
+        del state["id"], state["kind"], state["created_at"]
+        async with session_factory() as session:
+            await session.execute(update(JobRecord).where(JobRecord.id == job.id).values(**state))
+            await session.commit()
+
+
+job_manager = JobManager()
@@ -0,0 +1,179 @@
+"""Локальный кэш миниатюр picture_url.
+
+Картинки скачиваются при загрузке пользователей и хранятся на диске по
+sha256 содержимого, поэтому одинаковые миниатюры занимают место один раз.
+Общий размер ограничен: при переполнении удаляются файлы, которые дольше
+всех не отдавались (mtime обновляется при чтении).
+"""
+import asyncio
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.services.http_client import get_http_client
+
+PICTURE_HASH = re.compile(r"^[0-9a-f]{64}$")
+# Сигнатуры по первым 12 байтам; RIFF — общий контейнер и для WAV/AVI
+MEDIA_TYPES = (
+    (re.compile(rb"\xff\xd8\xff"), "image/jpeg"),
+    (re.compile(rb"\x89PNG\r\n\x1a\n"), "image/png"),
+    (re.compile(rb"GIF8"), "image/gif"),
+    (re.compile(rb"RIFF.{4}WEBP", re.DOTALL), "image/webp"),
+)
+# mtime обновляется не чаще раза в час: для LRU этого хватает, а лишних syscall нет
+TOUCH_INTERVAL = 3600.0
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    for magic, media_type in MEDIA_TYPES:
+        if magic.match(head):
+            return media_type
+    return None
+
+
+class PictureStore:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+
+    def path(self, picture_hash: str) -> Path:
+        return self.root / picture_hash[:2] / picture_hash
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def get(self, picture_hash: str) -> Optional[Path]:
+        if not PICTURE_HASH.match(picture_hash):
+            return None
+        path = self.path(picture_hash)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            os.utime(path, (now, now))
+        return path
+
+    def put(self, data: bytes) -> str:
+        picture_hash = hashlib.sha256(data).hexdigest()
+        path = self.path(picture_hash)
+        if not path.exists():
+            size = self.size
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Запись через временный файл: читатель не увидит недописанную картинку
+            tmp = path.with_name(f"{picture_hash}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._size = size + len(data)
+            if self._size > self.max_bytes:
+                self.evict()
+        return picture_hash
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        if not self.root.exists():
+            return entries
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file() and PICTURE_HASH.match(entry.name):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries
+
+    def evict(self) -> int:
+        """Удаляет давно не читанные файлы до 90% лимита; возвращает их число."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+
+class PictureDownloader:
+    def __init__(
+        self,
+        store: PictureStore,
+        client: Optional[httpx.AsyncClient] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.store = store
+        self.client = client
+        self.concurrency = concurrency or settings.PICTURE_DOWNLOAD_CONCURRENCY
+
+    async def download(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Скачивает картинки параллельно; возвращает url -> hash для удачных."""
+        client = self.client or get_http_client()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(url: str) -> Tuple[str, Optional[str]]:
+            # Без локальной копии страница покажет оригинальный picture_url
+            async with semaphore:
+                try:
+                    data = await self._read(client, url)
+                except httpx.HTTPError:
+                    return url, None
+            if data is None or sniff_media_type(data[:12]) is None:
+                return url, None
+            try:
+                return url, await asyncio.to_thread(self.store.put, data)
+            except OSError:
+                # Диск заполнен или нет прав — пользователи всё равно загружаются
+                return url, None
+
+        unique = [url for url in dict.fromkeys(urls) if url]
+        results = await asyncio.gather(*(fetch(url) for url in unique))
+        return {url: picture_hash for url, picture_hash in results if picture_hash}
+
+    @staticmethod
+    async def _read(client: httpx.AsyncClient, url: str) -> Optional[bytes]:
+        """Тело ответа или None, если оно больше PICTURE_MAX_FILE_BYTES."""
+        limit = settings.PICTURE_MAX_FILE_BYTES
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > limit:
+                    return None
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+
+def picture_src(user: Any) -> str:
+    """Адрес картинки для шаблонов: локальная копия, если она есть."""
+    picture_hash = getattr(user, "picture_hash", None)
+    if picture_hash and settings.PICTURE_CACHE_ENABLED:
+        return f"/pictures/{picture_hash}"
+    return user.picture_url
+
+
+_store: Optional[PictureStore] = None
+
+
+def get_picture_store() -> Optional[PictureStore]:
+    global _store
+    if not settings.PICTURE_CACHE_ENABLED:
+        return None
+    if _store is None:
+        _store = PictureStore(settings.PICTURE_CACHE_DIR, settings.PICTURE_CACHE_MAX_BYTES)
+    return _store
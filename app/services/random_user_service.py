@@ -1,54 +1,152 @@
+import asyncio
+import time
 import httpx
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 from app.config import settings
-from app.repositories.user_repository import UserRepository
+from app.location import parse_coordinate
+from app.metrics import INGEST_ROWS, INGEST_ROWS_PER_SECOND, INGEST_STAGE_DURATION
+from app.repositories.user_repository import UserRepository, BulkInsertResult, RowFailure
+from app.services.pictures import PictureDownloader, get_picture_store
+from app.services.user_sources import UserSource, build_user_source, split_pages
+
 
 class RandomUserService:
-    def __init__(self, repository: UserRepository):
+    def __init__(
+        self,
+        repository: UserRepository,
+        client: Optional[httpx.AsyncClient] = None,
+        pictures: Optional[PictureDownloader] = None,
+        source: Optional[UserSource] = None,
+    ):
         self.repository = repository
+        self.client = client
+        self.source = source or build_user_source(settings.USER_SOURCE, client)
+        if pictures is None and (store := get_picture_store()) is not None:
+            pictures = PictureDownloader(store, client)
+        self.pictures = pictures
 
     async def fetch_users(self, count: int) -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                str(settings.RANDOM_USER_API),
-                params={"results": count}
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["results"]
+        return await self.source.fetch(count)
 
-    async def load_users(self, count: int) -> None:
+    async def load_users(
+        self, count: int, on_progress: Optional[Callable[[BulkInsertResult], None]] = None
+    ) -> BulkInsertResult:
         if count <= 0:
             raise ValueError("Count must be positive")
-            
-        users_data = await self.fetch_users(count)
-        for user_data in users_data:
+
+        # Страницы скачиваются параллельно и вставляются по мере поступления
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.RANDOM_USER_CONCURRENCY)
+        semaphore = asyncio.Semaphore(settings.RANDOM_USER_CONCURRENCY)
+
+        async def fetch(offset: int, size: int) -> None:
+            async with semaphore:
+                with INGEST_STAGE_DURATION.time("fetch"):
+                    users_data = await self.fetch_users(size)
+            # Картинки качаются здесь, параллельно со вставкой предыдущих страниц
+            with INGEST_STAGE_DURATION.time("pictures"):
+                picture_hashes = await self._download_pictures(users_data)
+            await queue.put((offset, users_data, picture_hashes))
+
+        async def produce() -> None:
+            tasks = [
+                asyncio.create_task(fetch(offset, size))
+                for offset, size in split_pages(count, self.source.page_size)
+            ]
             try:
-                user_dict = self._transform_user_data(user_data)
-                await self.repository.create_user(user_dict)
-            except Exception as e:
-                continue
-    
+                await asyncio.gather(*tasks)
+            except BaseException as e:
+                # gather не отменяет соседей: без этого они навсегда зависнут на queue.put
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                # При отмене потребитель уже вышел и очередь никто не читает
+                if not isinstance(e, asyncio.CancelledError):
+                    await queue.put(None)
+                raise
+            await queue.put(None)
+
+        started = time.perf_counter()
+        producer = asyncio.create_task(produce())
+        result = BulkInsertResult()
+        try:
+            while (page := await queue.get()) is not None:
+                offset, users_data, picture_hashes = page
+                await self._insert_page(users_data, offset, result, picture_hashes)
+                if on_progress is not None:
+                    on_progress(result)
+        except BaseException:
+            producer.cancel()
+            raise
+        await producer
+
+        result.failures.sort(key=lambda f: f.index)
+        INGEST_ROWS.inc("inserted", amount=result.inserted)
+        INGEST_ROWS.inc("duplicate", amount=result.duplicates)
+        INGEST_ROWS.inc("updated", amount=result.updated)
+        INGEST_ROWS.inc("failed", amount=len(result.failures))
+        INGEST_ROWS_PER_SECOND.set(result.inserted / (time.perf_counter() - started))
+        return result
+
+    async def _download_pictures(self, users_data: List[Dict[str, Any]]) -> Dict[str, str]:
+        if self.pictures is None:
+            return {}
+        urls = []
+        for user_data in users_data:
+            # Битые записи не мешают: их отклонит _insert_page
+            picture = user_data.get("picture") if isinstance(user_data, dict) else None
+            if isinstance(picture, dict) and isinstance(picture.get("thumbnail"), str):
+                urls.append(picture["thumbnail"])
+        return await self.pictures.download(urls)
+
+    async def _insert_page(
+        self,
+        users_data: List[Dict[str, Any]],
+        offset: int,
+        result: BulkInsertResult,
+        picture_hashes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        picture_hashes = picture_hashes or {}
+        rows, positions = [], []
+        with INGEST_STAGE_DURATION.time("transform"):
+            for index, user_data in enumerate(users_data, start=offset):
+                try:
+                    row = self._transform_user_data(user_data)
+                    row["picture_hash"] = picture_hashes.get(row["picture_url"])
+                    rows.append(row)
+                    positions.append(index)
+                except (KeyError, TypeError, AttributeError) as e:
+                    result.failures.append(RowFailure(index, f"Malformed user data: {e!r}"))
+
+        with INGEST_STAGE_DURATION.time("insert"):
+            # COPY, где это возможно (asyncpg и on_conflict=error), иначе INSERT ... RETURNING
+            page_result = await self.repository.bulk_create_users(
+                rows, method="copy", on_conflict=settings.INGEST_ON_CONFLICT
+            )
+        result.inserted += page_result.inserted
+        result.duplicates += page_result.duplicates
+        result.updated += page_result.updated
+        result.inserted_ids.extend(page_result.inserted_ids)
+        # Индексы ошибок вставки переводим в индексы исходного ответа API
+        result.failures.extend(RowFailure(positions[f.index], f.error) for f in page_result.failures)
+
     def _transform_user_data(self, user_data: dict) -> dict:
         location = user_data["location"]
         street = location.get("street", {})
+        coordinates = location.get("coordinates", {})
         
         return {
+            "external_id": user_data.get("login", {}).get("uuid"),
             "gender": user_data["gender"],
             "first_name": user_data["name"]["first"],
             "last_name": user_data["name"]["last"],
             "email": user_data["email"],
             "phone": user_data["phone"],
-            "location": self._format_location(location),
-            "picture_url": user_data["picture"]["thumbnail"]
+            "picture_url": user_data["picture"]["thumbnail"],
+            "country": location.get("country"),
+            "state": location.get("state"),
+            "city": location.get("city"),
+            "street_number": street.get("number"),
+            "street_name": street.get("name"),
+            "latitude": parse_coordinate(coordinates.get("latitude")),
+            "longitude": parse_coordinate(coordinates.get("longitude"))
         }
-
-    def _format_location(self, location: dict) -> str:
-        street = location.get("street", {})
-        parts = [
-            f"Country: {location.get('country', 'N/A')}",
-            f"State: {location.get('state', 'N/A')}",
-            f"City: {location.get('city', 'N/A')}",
-            f"Street: {street.get('number', 'N/A')} {street.get('name', 'N/A')}"
-        ]
-        return "\n".join(parts)
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""Очистка таблицы users без долгой блокировки читателей.
+
+Режимы:
+- batched  — DELETE пачками по id, каждая пачка в своей транзакции;
+  читатели не блокируются, счётчик id не сбрасывается. Работает везде.
+- swap     — только PostgreSQL: старая таблица переименовывается, на её
+  место создаётся пустая по текущей модели, старая удаляется отдельной
+  транзакцией. ACCESS EXCLUSIVE держится только на время операций каталога.
+- truncate — TRUNCATE ... RESTART IDENTITY на PostgreSQL, DELETE на SQLite.
+"""
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.events import notify_users_changed
+from app.models.user import User, drop_user_count_triggers, install_user_count_triggers
+from app.repositories.statements import id_in
+from app.services.jobs import Job, job_manager
+
+RESET_MODES = ("auto", "batched", "swap", "truncate")
+
+
+def resolve_mode(mode: str, dialect: str) -> str:
+    if mode == "auto":
+        return "swap" if dialect == "postgresql" else "batched"
+    if mode == "swap" and dialect != "postgresql":
+        raise ValueError("swap reset is only supported on PostgreSQL")
+    return mode
+
+
+async def reset_users(
+    session_factory: sessionmaker,
+    mode: str = "auto",
+    batch_size: Optional[int] = None,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> dict:
+    """Удаляет всех пользователей; on_progress(удалено, всего) после каждого шага."""
+    async with session_factory() as session:
+        connection = await session.connection()
+        dialect = connection.dialect.name
+        total = (await session.execute(text("SELECT count(*) FROM users"))).scalar()
+    mode = resolve_mode(mode, dialect)
+
+    def report(done: int) -> None:
+        if on_progress is not None:
+            on_progress(done, total)
+
+    try:
+        if mode == "batched":
+            deleted = await _batched_delete(session_factory, batch_size or settings.RESET_BATCH_SIZE, report)
+        else:
+            async with session_factory() as session:
+                connection = await session.connection()
+                if dialect == "postgresql":
+                    await connection.execute(
+                        text(f"SET LOCAL lock_timeout = '{int(settings.RESET_LOCK_TIMEOUT * 1000)}ms'")
+                    )
+                if mode == "swap":
+                    old_table = await connection.run_sync(_swap_table)
+                else:
+                    await connection.run_sync(_truncate)
+                await session.commit()
+            deleted = total
+            report(deleted)
+            if mode == "swap":
+                # Удаление файлов старой таблицы — уже вне критической транзакции
+                async with session_factory() as session:
+                    await session.execute(text(f'DROP TABLE IF EXISTS "{old_table}"'))
+                    await session.commit()
+    finally:
+        # Кэши, счётчики и семплеры сбрасываются даже после частичной очистки
+        notify_users_changed()
+
+    return {"mode": mode, "deleted": deleted}
+
+
+async def _batched_delete(
+    session_factory: sessionmaker, batch_size: int, report: Callable[[int], None]
+) -> int:
+    deleted, last_id = 0, 0
+    while True:
+        async with session_factory() as session:
+            ids = (await session.execute(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            )).scalars().all()
+            if not ids:
+                return deleted
+            await session.execute(
+                delete(User).where(id_in(session, ids)).execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        last_id = ids[-1]
+        deleted += len(ids)
+        notify_users_changed()
+        report(deleted)
+
+
+def _truncate(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("TRUNCATE TABLE users RESTART IDENTITY"))
+    else:
+        conn.execute(text("DELETE FROM users"))
+
+
+def _swap_table(conn: Connection) -> str:
+    """Переименовывает users и её объекты, создаёт пустую users; возвращает имя старой."""
+    suffix = uuid.uuid4().hex[:8]
+    old_table = f"users_old_{suffix}"
+
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('users', 'id')")).scalar()
+    indexes = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'users'")
+    ).scalars().all()
+
+    conn.execute(text("LOCK TABLE users IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f'ALTER TABLE users RENAME TO "{old_table}"'))
+    # Имена индексов и последовательности уникальны в схеме — освобождаем их
+    for name in indexes:
+        conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name[:50]}_{suffix}"'))
+    if sequence:
+        conn.execute(text(f'ALTER SEQUENCE {sequence} RENAME TO "users_id_seq_{suffix}"'))
+    drop_user_count_triggers(conn, old_table)
+
+    # Новая таблица получает свою последовательность с 1 — как RESTART IDENTITY
+    User.__table__.create(conn)
+    if settings.USER_COUNT_MODE == "counter_table":
+        install_user_count_triggers(conn)
+        conn.execute(text("UPDATE users_count SET total = 0 WHERE id = 1"))
+    return old_table
+
+
+async def run_reset_job(job: Job, session_factory: sessionmaker, mode: str) -> None:
+    async def reset(job: Job) -> dict:
+        def report(done: int, total: Optional[int]) -> None:
+            job.progress, job.total = done, total
+
+        return await reset_users(session_factory, mode, on_progress=report)
+
+    await job_manager.run(job, reset, session_factory)
@@ -0,0 +1,85 @@
+"""Начальное заполнение таблицы users в фоне после старта приложения.
+
+Сидирование выполняет один воркер: он держит advisory lock PostgreSQL,
+остальные пропускают этот шаг. Прогресс виден через задачу seed_users
+и эндпоинт /system/ready.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+from app.services.jobs import Job, job_manager
+from app.services.random_user_service import RandomUserService
+from app.services.user_sources import build_user_source
+
+# Произвольная, но постоянная константа для pg_try_advisory_lock
+SEED_LOCK_ID = 0x5EED_0001
+
+_seed_job: Optional[Job] = None
+
+
+def get_seed_job() -> Optional[Job]:
+    return _seed_job
+
+
+@asynccontextmanager
+async def advisory_lock(engine: AsyncEngine, lock_id: int = SEED_LOCK_ID) -> AsyncIterator[bool]:
+    """Неблокирующий сессионный lock; отдаёт True, если он достался нам.
+
+    Lock привязан к соединению, поэтому соединение держится до выхода из
+    контекста. На SQLite (тесты, разработка) один процесс и lock не нужен.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    async with engine.connect() as conn:
+        acquired = (await conn.execute(
+            text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": lock_id}
+        )).scalar()
+        await conn.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": lock_id})
+                await conn.commit()
+
+
+async def seed_users(engine: AsyncEngine, session_factory: sessionmaker, target: int) -> None:
+    """Дозаполняет users до target строк; повторный вызов ничего не делает."""
+    global _seed_job
+    job = _seed_job = await job_manager.create(session_factory, "seed_users", total=target)
+
+    async def seed(job: Job) -> dict:
+        async with advisory_lock(engine) as acquired:
+            if not acquired:
+                # Сидирует другой воркер; его прогресс виден на его /system/ready
+                return {"skipped": True, "inserted": 0}
+
+            async with session_factory() as session:
+                repo = UserRepository(session)
+                existing = await repo.count_users()
+                job.progress = existing
+                if existing >= target:
+                    return {"skipped": False, "inserted": 0}
+
+                def report(result):
+                    job.progress = existing + result.inserted
+
+                service = RandomUserService(repo, source=build_user_source(settings.SEED_SOURCE))
+                result = await service.load_users(target - existing, on_progress=report)
+                return {
+                    "skipped": False,
+                    "inserted": result.inserted,
+                    "duplicates": result.duplicates,
+                    "updated": result.updated,
+                    "failed": len(result.failures),
+                }
+
+    await job_manager.run(job, seed, session_factory)
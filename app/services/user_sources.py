@@ -0,0 +1,220 @@
+"""Источники записей пользователей для RandomUserService.
+
+Источник отдаёт записи в формате ответа randomuser.me, дальше они идут
+обычным путём: _transform_user_data и bulk_create_users.
+
+- HttpUserSource — randomuser.me (RANDOM_USER_API) со страницами и повторами;
+- SyntheticUserSource — локальный генератор без сети: быстрое сидирование,
+  тесты и бенчмарки. NumPy разыгрывает случайные столбцы на всю пачку сразу,
+  а строки и словари записей собираются обычным циклом — на него и уходит
+  основное время.
+"""
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from app.config import settings
+from app.services.http_client import get_http_client
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+GENDERS = ("male", "female")
+FIRST_NAMES = {
+    "male": ("James", "Lucas", "Ivan", "Noah", "Oliver", "Mateo", "Leon", "Elias", "Hugo", "Arthur", "Emil", "Oskar"),
+    "female": ("Emma", "Olivia", "Maria", "Sofia", "Anna", "Mia", "Ella", "Nora", "Alice", "Ida", "Lina", "Vera"),
+}
+LAST_NAMES = (
+    "Smith", "Jensen", "Garcia", "Muller", "Rossi", "Kowalski", "Ivanova", "Petrov",
+    "Dubois", "Nielsen", "Silva", "Novak", "Berg", "Moreau", "Fischer", "Lopez",
+)
+PLACES = (
+    ("Norway", "Oslo", "Oslo"),
+    ("Norway", "Vestland", "Bergen"),
+    ("Germany", "Bavaria", "Munich"),
+    ("Germany", "Berlin", "Berlin"),
+    ("Spain", "Catalonia", "Barcelona"),
+    ("France", "Ile-de-France", "Paris"),
+    ("Canada", "Ontario", "Toronto"),
+    ("Australia", "Victoria", "Melbourne"),
+    ("Brazil", "Bahia", "Salvador"),
+    ("Finland", "Uusimaa", "Helsinki"),
+)
+STREET_NAMES = ("Main Street", "Park Avenue", "Church Road", "Mill Lane", "High Street", "Station Road")
+PORTRAIT_DIRS = {"male": "men", "female": "women"}
+PORTRAITS = 100
+
+
+class UserSource:
+    # Сколько записей RandomUserService запрашивает за раз
+    page_size: int = 1000
+
+    async def fetch(self, count: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class HttpUserSource(UserSource):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.client = client
+
+    @property
+    def page_size(self) -> int:
+        return settings.RANDOM_USER_PAGE_SIZE
+
+    async def fetch(self, count: int) -> List[Dict[str, Any]]:
+        pages = split_pages(count, self.page_size)
+        if len(pages) == 1:
+            return await self._fetch_page(count)
+
+        semaphore = asyncio.Semaphore(settings.RANDOM_USER_CONCURRENCY)
+
+        async def fetch(size: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._fetch_page(size)
+
+        results = await asyncio.gather(*(fetch(size) for _, size in pages))
+        return [user for page in results for user in page]
+
+    async def _fetch_page(self, count: int) -> List[Dict[str, Any]]:
+        client = self.client or get_http_client()
+        max_retries = settings.RANDOM_USER_MAX_RETRIES
+
+        for attempt in range(max_retries + 1):
+            try:
+                response = await client.get(
+                    str(settings.RANDOM_USER_API),
+                    params={"results": count}
+                )
+            except httpx.TransportError:
+                if attempt == max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response.json()["results"]
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        delay = settings.RANDOM_USER_RETRY_BACKOFF * 2 ** attempt
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                delay = max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        # Retry-After приходит от чужого сервера — не ждём дольше своего предела
+        return min(delay, settings.RANDOM_USER_MAX_BACKOFF)
+
+
+class SyntheticUserSource(UserSource):
+    """Случайные, но правдоподобные записи в формате randomuser.me.
+
+    С seed результат воспроизводим: каждая пачка получает seed (seed, номер
+    пачки).
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        picture_base_url: str = "https://randomuser.me/api/portraits/",
+    ):
+        self.seed = seed
+        self.page_size = batch_size or settings.SYNTHETIC_BATCH_SIZE
+        self.picture_base_url = picture_base_url
+        self._batches = itertools.count()
+
+    async def fetch(self, count: int) -> List[Dict[str, Any]]:
+        # Номер пачки берётся до ухода в поток, чтобы порядок не зависел от планировщика
+        batch = next(self._batches)
+        return await asyncio.to_thread(self.generate, count, batch)
+
+    def generate(self, count: int, batch: Optional[int] = None) -> List[Dict[str, Any]]:
+        if batch is None:
+            batch = next(self._batches)
+        return self._records(self._columns(count, batch))
+
+    def _columns(self, count: int, batch: int) -> Dict[str, Sequence]:
+        rng = np.random.default_rng(None if self.seed is None else [self.seed, batch])
+        return {
+            "gender": rng.integers(0, len(GENDERS), count).tolist(),
+            "first": rng.integers(0, len(FIRST_NAMES["male"]), count).tolist(),
+            "last": rng.integers(0, len(LAST_NAMES), count).tolist(),
+            "place": rng.integers(0, len(PLACES), count).tolist(),
+            "street_number": rng.integers(1, 10000, count).tolist(),
+            "street_name": rng.integers(0, len(STREET_NAMES), count).tolist(),
+            "phone": rng.integers(0, 10 ** 9, count).tolist(),
+            "latitude": rng.integers(-900000, 900001, count).tolist(),
+            "longitude": rng.integers(-1800000, 1800001, count).tolist(),
+            "portrait": rng.integers(0, PORTRAITS, count).tolist(),
+            "uuid": rng.bytes(16 * count),
+        }
+
+    def _records(self, columns: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+        base = self.picture_base_url
+        uuids = columns["uuid"].hex()
+        records = []
+        rows = zip(
+            columns["gender"], columns["first"], columns["last"], columns["place"],
+            columns["street_number"], columns["street_name"], columns["phone"],
+            columns["latitude"], columns["longitude"], columns["portrait"],
+        )
+        for i, (gender, first, last, place, number, street, phone, latitude, longitude, portrait) in enumerate(rows):
+            gender = GENDERS[gender]
+            first, last = FIRST_NAMES[gender][first], LAST_NAMES[last]
+            country, state, city = PLACES[place]
+            h = uuids[32 * i:32 * i + 32]
+            # Версия 4 и вариант RFC 4122, как у настоящих login.uuid
+            login_uuid = f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+            portrait = f"{PORTRAIT_DIRS[gender]}/{portrait}.jpg"
+            records.append({
+                "gender": gender,
+                "name": {"title": "Mx", "first": first, "last": last},
+                "location": {
+                    "street": {"number": number, "name": STREET_NAMES[street]},
+                    "city": city,
+                    "state": state,
+                    "country": country,
+                    "coordinates": {
+                        "latitude": f"{latitude / 10000:.4f}",
+                        "longitude": f"{longitude / 10000:.4f}",
+                    },
+                },
+                "email": f"{first.lower()}.{last.lower()}.{h[:8]}@example.com",
+                "login": {"uuid": login_uuid},
+                "phone": f"{phone:09d}",
+                "picture": {
+                    "large": f"{base}{portrait}",
+                    "medium": f"{base}med/{portrait}",
+                    "thumbnail": f"{base}thumb/{portrait}",
+                },
+            })
+        return records
+
+
+def split_pages(count: int, page_size: int) -> List[tuple]:
+    return [
+        (offset, min(page_size, count - offset))
+        for offset in range(0, count, page_size)
+    ]
+
+
+_synthetic_source: Optional[SyntheticUserSource] = None
+
+
+def build_user_source(kind: str, client: Optional[httpx.AsyncClient] = None) -> UserSource:
+    global _synthetic_source
+    if kind == "synthetic":
+        # Один генератор на процесс: иначе с SYNTHETIC_SEED каждая загрузка
+        # начинала бы с пачки 0 и повторяла те же login.uuid
+        if _synthetic_source is None:
+            _synthetic_source = SyntheticUserSource(seed=settings.SYNTHETIC_SEED)
+        return _synthetic_source
+    if kind == "http":
+        return HttpUserSource(client)
+    raise ValueError(f"Unknown user source: {kind}")
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.cache import PageCache
+from app.config import settings
+from app.events import on_users_changed
+from app.location import user_location_lines
+from app.services.pictures import picture_src
+
+TEMPLATES_DIR = "app/templates"
+
+
+def build_environment() -> Environment:
+    # Байткод шаблонов переживает перезапуск, так что после деплоя
+    # первые запросы не компилируют шаблоны заново
+    bytecode_cache = (
+        FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR or None)
+        if settings.TEMPLATE_BYTECODE_CACHE else None
+    )
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache,
+    )
+    env.globals["user_location_lines"] = user_location_lines
+    env.globals["picture_src"] = picture_src
+    return env
+
+
+templates = Jinja2Templates(env=build_environment())
+
+
+def precompile_templates() -> int:
+    """Компилирует все шаблоны заранее; вызывается при старте приложения."""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+
+_page_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> Optional[PageCache]:
+    global _page_cache
+    if not settings.PAGE_CACHE_ENABLED:
+        return None
+    if _page_cache is None:
+        _page_cache = PageCache(max_bytes=settings.PAGE_CACHE_MAX_BYTES, ttl=settings.PAGE_CACHE_TTL)
+        on_users_changed(_page_cache.clear)
+    return _page_cache
@@ -0,0 +1,50 @@
+"""Латентность глубоких страниц: OFFSET против keyset-курсора.
+
+    python -m benchmarks.bench_pagination --rows 2000000 --pages 1,1000,100000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.repositories.pagination import NEXT, Cursor, encode_cursor
+from app.repositories.user_repository import UserRepository
+from benchmarks.common import measure, seed_users, summarize
+
+PER_PAGE = 20
+
+
+async def run(url: str, rows: int, pages: list, iterations: int) -> None:
+    engine = create_async_engine(url)
+    await seed_users(engine, rows)
+
+    print(f"{'page':>10} {'strategy':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    async with AsyncSession(engine) as session:
+        repo = UserRepository(session)
+        for page in pages:
+            skip = (page - 1) * PER_PAGE
+            # id предыдущей страницы: синтетические id идут подряд с 1
+            cursor = encode_cursor(Cursor(NEXT, skip, page)) if page > 1 else None
+            strategies = {
+                "offset": lambda: repo.get_users(skip=skip, limit=PER_PAGE),
+                "keyset": lambda: repo.get_users_page(limit=PER_PAGE, cursor=cursor),
+            }
+            for name, call in strategies.items():
+                stats = summarize(await measure(call, iterations))
+                print(f"{page:>10} {name:>8} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench_pagination.db")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--pages", default="1,1000,100000")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    pages = [int(page) for page in args.pages.split(",")]
+    asyncio.run(run(args.url, args.rows, pages, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Запросов в секунду: response_model + стандартный JSON против FastJSONResponse.
+
+    python -m benchmarks.bench_serialization --sizes 1,1000 --iterations 200
+
+БД не участвует: оба маршрута отдают одни и те же ORM-объекты из памяти,
+поэтому разница — только валидация и сериализация ответа.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.serialization import FastJSONResponse, users_to_list
+from benchmarks.common import measure, summarize, synthetic_rows
+
+
+def build_app(rows: List[User]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pydantic/{n}", response_model=List[UserSchema])
+    async def pydantic_path(n: int):
+        return rows[:n]
+
+    @app.get("/fast/{n}", response_model=List[UserSchema])
+    async def fast_path(n: int):
+        return FastJSONResponse(users_to_list(rows[:n]))
+
+    return app
+
+
+async def run(sizes: List[int], iterations: int) -> None:
+    now = datetime.now(timezone.utc)
+    rows = [
+        User(id=i + 1, updated_at=now, location=None, latitude=59.9, longitude=10.7, **row)
+        for i, row in enumerate(synthetic_rows(0, max(sizes)))
+    ]
+    transport = httpx.ASGITransport(app=build_app(rows))
+
+    print(f"{'rows':>6} {'path':>9} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in sizes:
+            for path in ("pydantic", "fast"):
+                url = f"/{path}/{size}"
+                await client.get(url)
+                started = time.perf_counter()
+                samples = await measure(lambda: client.get(url), iterations)
+                rps = iterations / (time.perf_counter() - started)
+                stats = summarize(samples)
+                print(f"{size:>6} {path:>9} {rps:>10.1f} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,1000")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(run(sizes, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Время от запуска uvicorn до первого ответа: сидирование в lifespan против фонового.
+
+    python -m benchmarks.bench_startup --workers 4 --runs 3
+
+Нужны переменные DB_* для PostgreSQL, как у самого приложения. Перед
+каждым запуском таблица users очищается, чтобы сидирование действительно
+ходило во внешний API (или в его заглушку через RANDOM_USER_API).
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from benchmarks.load import ServerProcess
+
+
+async def clear_users(url: str) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM users"))
+    await engine.dispose()
+
+
+async def run(modes: list, workers: int, runs: int, port: int, target: int) -> None:
+    results = {}
+    print(f"{'mode':>12} {'run':>4} {'first response s':>18}")
+    for mode in modes:
+        timings = []
+        for run_index in range(runs):
+            await clear_users(settings.database_url)
+            env = {"SEED_MODE": mode, "SEED_TARGET_USERS": str(target)}
+            started = time.perf_counter()
+            async with ServerProcess(port, env, workers=workers):
+                elapsed = time.perf_counter() - started
+            timings.append(elapsed)
+            print(f"{mode:>12} {run_index:>4} {elapsed:>18.2f}")
+        results[mode] = timings
+    print(json.dumps(results, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="blocking,background")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--target", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.modes.split(","), args.workers, args.runs, args.port, args.target))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import Base
+from app.models.user import User
+
+GENDERS = ("male", "female")
+SEED_CHUNK = 10_000
+
+
+def synthetic_rows(start: int, count: int) -> List[dict]:
+    return [
+        {
+            "gender": GENDERS[i % 2],
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"user{i}@bench.local",
+            "phone": f"{i:010d}",
+            "country": "Bench",
+            "state": f"S{i % 50}",
+            "city": f"C{i % 1000}",
+            "street_number": i,
+            "street_name": "Main",
+            "picture_url": f"https://example.com/{i % 100}.jpg",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+async def seed_users(engine: AsyncEngine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        existing = (await conn.execute(select(func.count(User.id)))).scalar()
+
+    while existing < rows:
+        chunk = min(SEED_CHUNK, rows - existing)
+        async with engine.begin() as conn:
+            await conn.execute(insert(User), synthetic_rows(existing, chunk))
+        existing += chunk
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def measure(call: Callable[[], Awaitable], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.common import summarize
+
+
+async def run_load(
+    base_url: str,
+    make_request: Callable[[httpx.AsyncClient, random.Random], "asyncio.Future"],
+    concurrency: int,
+    total_requests: int,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """concurrency клиентов делят total_requests запросов; возвращает перцентили."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total_requests
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def worker(worker_id: int) -> None:
+            nonlocal remaining, errors
+            rng = random.Random(seed + worker_id)
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await make_request(client, rng)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    stats.update({"errors": errors, "throughput_rps": len(latencies) / elapsed})
+    return stats
+
+
+class ServerProcess:
+    """uvicorn-приложение (по умолчанию main:app) в отдельном процессе с дополнительными переменными окружения."""
+
+    def __init__(
+        self,
+        port: int,
+        env: Dict[str, str],
+        workers: int = 1,
+        app: str = "main:app",
+        ready_path: str = "/system/pool",
+    ):
+        self.port = port
+        self.env = {**os.environ, **env}
+        self.workers = workers
+        self.app = app
+        self.ready_path = ready_path
+        self.process = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def __aenter__(self) -> "ServerProcess":
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", self.app, "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            env=self.env,
+        )
+        async with httpx.AsyncClient(base_url=self.url) as client:
+            for _ in range(600):
+                try:
+                    await client.get(self.ready_path)
+                    return self
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+        raise RuntimeError("Server did not start")
+
+    async def __aexit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=30)
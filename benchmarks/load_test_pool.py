@@ -0,0 +1,57 @@
+"""p99 под нагрузкой для разных настроек пула соединений.
+
+Нужна PostgreSQL из .env с заполненной таблицей users:
+
+    python -m benchmarks.load_test_pool --concurrency 500 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.load import ServerProcess, run_load
+
+POOL_CONFIGS = {
+    "default": {},
+    "no_pre_ping": {"DB_POOL_PRE_PING": "false"},
+    "small": {"DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "0"},
+    "large": {"DB_POOL_SIZE": "40", "DB_MAX_OVERFLOW": "60"},
+    "no_statement_cache": {"DB_STATEMENT_CACHE_SIZE": "0"},
+}
+
+
+async def hot_endpoints(client: httpx.AsyncClient, rng) -> httpx.Response:
+    if rng.random() < 0.5:
+        return await client.get("/api/v1/random")
+    return await client.get(f"/api/v1/{rng.randint(1, 1000)}")
+
+
+async def run(configs: list, concurrency: int, requests: int, port: int) -> None:
+    print(f"{'config':>20} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8} {'wait max ms':>12} {'errors':>7}")
+    for name in configs:
+        # Кэш пользователей выключен, чтобы нагрузка доходила до пула
+        env = {**POOL_CONFIGS[name], "USER_CACHE_ENABLED": "false"}
+        async with ServerProcess(port, env) as server:
+            stats = await run_load(server.url, hot_endpoints, concurrency, requests)
+            async with httpx.AsyncClient(base_url=server.url) as client:
+                pool = (await client.get("/system/pool")).json()
+        print(
+            f"{name:>20} {stats['throughput_rps']:>8.0f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p99_ms']:>8.2f} {pool['wait_max_seconds'] * 1000:>12.2f} {stats['errors']:>7}"
+        )
+        print(json.dumps({"config": name, "load": stats, "pool": pool}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", default=",".join(POOL_CONFIGS))
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(run(args.configs.split(","), args.concurrency, args.requests, args.port))
+
+
+if __name__ == "__main__":
+    main()
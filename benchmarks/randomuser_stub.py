@@ -0,0 +1,46 @@
+"""Локальная замена randomuser.me для бенчмарков: тот же формат ответа, без сети.
+
+    uvicorn benchmarks.randomuser_stub:app --port 8766
+    RANDOM_USER_API=http://127.0.0.1:8766/api/ uvicorn main:app
+
+Записи даёт SyntheticUserSource. Ответы детерминированы: ?seed=... или
+номер запроса с начала работы заглушки (база — переменная STUB_SEED).
+"""
+import itertools
+import os
+import zlib
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.services.user_sources import SyntheticUserSource
+
+MAX_RESULTS = 5000
+# Минимальный заголовок JPEG: достаточно для проверки формата в кэше картинок
+THUMBNAIL = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + bytes(512)
+
+_requests = itertools.count()
+
+
+async def api(request: Request) -> JSONResponse:
+    count = max(1, min(int(request.query_params.get("results", 1)), MAX_RESULTS))
+    seed = request.query_params.get("seed") or f"{os.environ.get('STUB_SEED', 'bench')}-{next(_requests)}"
+    source = SyntheticUserSource(
+        seed=zlib.crc32(seed.encode()), picture_base_url=f"{request.base_url}portraits/"
+    )
+    return JSONResponse({
+        "results": source.generate(count),
+        "info": {"seed": seed, "results": count, "page": 1, "version": "1.4"},
+    })
+
+
+async def portrait(request: Request) -> Response:
+    return Response(THUMBNAIL, media_type="image/jpeg", headers={"Cache-Control": "public, max-age=86400"})
+
+
+app = Starlette(routes=[
+    Route("/api/", api),
+    Route("/portraits/{path:path}", portrait),
+])
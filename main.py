@@ -1,32 +1,46 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from app.database import engine, Base
-from app.routers import api, frontend
+from app.config import settings
+from app.database import async_session, engine, replica_engines
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.migrations import run_migrations
+from app.routers import api, frontend, metrics, pictures, system
+from app.services.http_client import close_http_client
+from app.services.seeding import seed_users
+from app.templating import precompile_templates
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    await init_db_data()
+    await run_migrations(engine)
+    precompile_templates()
+
+    # Сидирование не задерживает старт: воркер сразу принимает запросы
+    seeding = None
+    if settings.SEED_MODE == "blocking":
+        await seed_users(engine, async_session, settings.SEED_TARGET_USERS)
+    elif settings.SEED_MODE == "background":
+        seeding = asyncio.create_task(seed_users(engine, async_session, settings.SEED_TARGET_USERS))
     
     yield  
 
-async def init_db_data():
-    from app.repositories.user_repository import UserRepository
-    from app.services.random_user_service import RandomUserService
-    from app.database import async_session
-
-    async with async_session() as session:
-        repo = UserRepository(session)
-        count_user = await repo.count_users()
-        if count_user < 1000:
-            service = RandomUserService(repo)
-            await service.load_users(1000 - count_user)
+    if seeding is not None and not seeding.done():
+        seeding.cancel()
+        with suppress(asyncio.CancelledError):
+            await seeding
+    await close_http_client()
 
 app = FastAPI(lifespan=lifespan)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    for db_engine in [engine, *replica_engines]:
+        instrument_engine(db_engine)
 app.include_router(api.router, prefix="/api/v1")
+app.include_router(system.router, prefix="/system")
+app.include_router(metrics.router)
+app.include_router(pictures.router)
 app.include_router(frontend.router)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
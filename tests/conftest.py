@@ -1,18 +1,26 @@
+import os
+
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from app.database import Base, create_engine_from_settings, get_db, get_session_factory
+from app.events import notify_users_changed
 from main import app
 from fastapi.testclient import TestClient
 
+# Пути, которых нет на SQLite (COPY, swap), проверяются на отдельной PostgreSQL
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgresql: тест нужна PostgreSQL из TEST_POSTGRES_URL")
+
+
 @pytest_asyncio.fixture(scope="session")
 async def db_engine():
-    engine = create_async_engine(
-        "sqlite+aiosqlite:///:memory:",
-        connect_args={"check_same_thread": False}
-    )
-    
+    engine = create_engine_from_settings("sqlite+aiosqlite:///:memory:")
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
@@ -22,7 +30,8 @@ async def db_engine():
 
 @pytest_asyncio.fixture
 async def db_session(db_engine):
-    async with db_engine.begin() as conn:
+    async with db_engine.connect() as conn:
+        transaction = await conn.begin()
         async_session_factory = sessionmaker(
             bind=conn,
             class_=AsyncSession,
@@ -31,13 +40,82 @@ async def db_session(db_engine):
         async with async_session_factory() as session:
             yield session
             await session.rollback()
+        if transaction.is_active:
+            await transaction.rollback()
+    # Откат данных теста должен сбросить и кэши приложения
+    notify_users_changed()
 
 @pytest.fixture
 def test_client(db_session):
     async def override_get_db():
         yield db_session
     
+    def override_get_session_factory():
+        return sessionmaker(
+            bind=db_session.bind,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
     client = TestClient(app)
     yield client
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def pg_engine():
+    """Чистая схема в TEST_POSTGRES_URL на каждый тест; без переменной тест пропускается."""
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine_from_settings(POSTGRES_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def pg_session(pg_engine):
+    async with AsyncSession(pg_engine, expire_on_commit=False) as session:
+        yield session
+
+
+class UserFactory:
+    """Тестовые пользователи: строки для UserRepository и записи в формате randomuser.me."""
+
+    def row(self, i, prefix="User", **fields):
+        row = {
+            "gender": "female",
+            "first_name": f"{prefix}{i}",
+            "last_name": "User",
+            "email": f"{prefix.lower()}{i}@test.com",
+            "phone": f"{i}",
+            "picture_url": f"http://test.com/{prefix.lower()}{i}.jpg",
+        }
+        row.update(fields)
+        return row
+
+    def api(self, i, prefix="Api", **fields):
+        record = {
+            "gender": "male",
+            "name": {"first": f"{prefix}{i}", "last": "User"},
+            "email": f"{prefix.lower()}{i}@test.com",
+            "phone": f"{i}",
+            "location": {"city": "Oslo", "street": {"number": i, "name": "Main"}},
+            "picture": {"thumbnail": f"http://test.com/{prefix.lower()}{i}.jpg"},
+        }
+        record.update(fields)
+        return record
+
+    async def create(self, repo, count, prefix="User", **fields):
+        return await repo.bulk_create_users([self.row(i, prefix, **fields) for i in range(count)])
+
+
+@pytest.fixture
+def user_factory():
+    return UserFactory()
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import status
+
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.mark.asyncio
+class TestBatchLookup:
+    async def test_repository_single_query(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        ids = (await user_factory.create(repo, 5, "Batch")).inserted_ids
+
+        users = await repo.get_users_by_ids([ids[3], ids[1], 999999])
+        assert {u.id for u in users} == {ids[3], ids[1]}
+        assert await repo.get_users_by_ids([]) == []
+
+    async def test_get_preserves_order_and_reports_missing(self, db_session, test_client, user_factory):
+        ids = (await user_factory.create(UserRepository(db_session), 5, "Batch")).inserted_ids
+        query = ",".join(str(i) for i in [ids[4], 999999, ids[0], ids[4]])
+
+        response = test_client.get("/api/v1/users", params={"ids": query})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [u["id"] for u in data["items"]] == [ids[4], ids[0]]
+        assert data["missing"] == [999999]
+
+    async def test_post_batch(self, db_session, test_client, user_factory):
+        ids = (await user_factory.create(UserRepository(db_session), 3, "Batch")).inserted_ids
+
+        response = test_client.post("/api/v1/users/batch", json={"ids": [ids[2], ids[1]]})
+        assert response.status_code == status.HTTP_200_OK
+        assert [u["first_name"] for u in response.json()["items"]] == ["Batch2", "Batch1"]
+
+    async def test_batch_size_is_capped(self, test_client, monkeypatch):
+        monkeypatch.setattr(settings, "BATCH_MAX_IDS", 2)
+        response = test_client.post("/api/v1/users/batch", json={"ids": [1, 2, 3]})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_invalid_ids(self, test_client):
+        response = test_client.get("/api/v1/users", params={"ids": "1,a"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_batch_shares_user_cache(self, db_session, test_client, user_factory):
+        ids = (await user_factory.create(UserRepository(db_session), 2, "Batch")).inserted_ids
+        test_client.get(f"/api/v1/{ids[0]}")
+        before = test_client.get("/system/cache").json()["users"]
+
+        test_client.post("/api/v1/users/batch", json={"ids": ids})
+
+        after = test_client.get("/system/cache").json()["users"]
+        assert after["hits"] == before["hits"] + 1
+        assert after["size"] == before["size"] + 1
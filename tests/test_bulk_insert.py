@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import patch
+
+from app.repositories.user_repository import UserRepository
+from app.services.random_user_service import RandomUserService
+
+
+@pytest.mark.asyncio
+class TestBulkCreateUsers:
+    async def test_inserts_all_rows_in_chunks(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        result = await repo.bulk_create_users([user_factory.row(i, "Bulk") for i in range(25)], chunk_size=10)
+
+        assert result.inserted == 25
+        assert len(result.inserted_ids) == 25
+        assert result.failures == []
+        assert await repo.count_users() == 25
+        first = await repo.get_user(result.inserted_ids[0])
+        assert first.first_name == "Bulk0"
+
+    async def test_bad_rows_do_not_drop_the_batch(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        existing = await repo.create_user(user_factory.row(100, "Bulk"))
+
+        rows = [user_factory.row(i, "Bulk") for i in range(5)]
+        rows[1] = user_factory.row(1, "Bulk", nickname="bad")
+        rows[3] = user_factory.row(3, "Bulk", id=existing.id)
+        result = await repo.bulk_create_users(rows, chunk_size=5)
+
+        assert result.inserted == 3
+        assert [f.index for f in result.failures] == [1, 3]
+        assert "nickname" in result.failures[0].error
+        assert await repo.count_users() == 4
+
+    async def test_database_error_falls_back_to_row_by_row(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        await repo.create_user(user_factory.row(100, "Bulk", external_id="taken"))
+
+        rows = [user_factory.row(i, "Bulk") for i in range(5)]
+        # Строка проходит предпроверку и падает уже в БД на уникальном индексе
+        rows[2] = user_factory.row(2, "Bulk", external_id="taken")
+        result = await repo.bulk_create_users(rows, chunk_size=5)
+
+        assert result.inserted == 4
+        assert len(result.inserted_ids) == 4
+        assert [f.index for f in result.failures] == [2]
+        assert "UNIQUE" in result.failures[0].error
+        assert await repo.count_users() == 5
+
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_load_users_reports_failures(self, mock_fetch, db_session, user_factory):
+        mock_fetch.return_value = [{"invalid": "data"}, user_factory.api(1, "Bulk")]
+
+        service = RandomUserService(UserRepository(db_session))
+        result = await service.load_users(2)
+
+        assert result.inserted == 1
+        assert [f.index for f in result.failures] == [0]
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestCopyInsert:
+    async def test_copy_returns_ids(self, pg_session, user_factory):
+        repo = UserRepository(pg_session)
+        result = await repo.bulk_create_users([user_factory.row(i, "Bulk") for i in range(5)], method="copy")
+
+        assert result.inserted == 5
+        users = {u.id: u.first_name for u in await repo.get_users()}
+        assert [users[user_id] for user_id in result.inserted_ids] == [f"Bulk{i}" for i in range(5)]
+
+    async def test_copy_bad_row_falls_back_to_row_by_row(self, pg_session, user_factory):
+        repo = UserRepository(pg_session)
+        rows = [user_factory.row(i, "Bulk") for i in range(5)]
+        rows[3] = user_factory.row(3, "Bulk", gender="x" * 50)
+
+        result = await repo.bulk_create_users(rows, method="copy")
+
+        assert result.inserted == 4
+        assert len(result.inserted_ids) == 4
+        assert [f.index for f in result.failures] == [3]
+        assert await repo.count_users() == 4
+
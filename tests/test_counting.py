@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.events import off_users_changed, on_users_changed
+from app.repositories.counting import (
+    CachedCounter,
+    CounterTableCounter,
+    EstimateCounter,
+    ExactCounter,
+)
+from app.migrations import sync_user_count_triggers
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.fixture
+def subscribed_counter():
+    counter = CachedCounter(ttl=60)
+    on_users_changed(counter.invalidate)
+    yield counter
+    off_users_changed(counter.invalidate)
+
+
+@pytest.mark.asyncio
+class TestUserCounters:
+    async def test_exact_counter(self, db_session, user_factory):
+        await UserRepository(db_session).bulk_create_users([user_factory.row(i, "Count") for i in range(4)])
+        assert await ExactCounter().count(db_session) == 4
+
+    async def test_cached_counter_until_invalidated(self, db_session, user_factory):
+        counter = CachedCounter(ttl=60)
+        repo = UserRepository(db_session)
+        await repo.bulk_create_users([user_factory.row(i, "Count") for i in range(3)])
+        assert await counter.count(db_session) == 3
+
+        await db_session.execute(text("DELETE FROM users"))
+        assert await counter.count(db_session) == 3
+
+        counter.invalidate()
+        assert await counter.count(db_session) == 0
+
+    async def test_cached_counter_invalidated_on_ingest(self, db_session, user_factory, subscribed_counter):
+        counter = subscribed_counter
+        repo = UserRepository(db_session)
+        assert await counter.count(db_session) == 0
+
+        await repo.bulk_create_users([user_factory.row(i, "Count") for i in range(2)])
+        assert await counter.count(db_session) == 2
+
+    async def test_cached_counter_expires(self, db_session, user_factory):
+        counter = CachedCounter(ttl=0)
+        assert await counter.count(db_session) == 0
+        await UserRepository(db_session).create_user(user_factory.row(0, "Count"))
+        assert await counter.count(db_session) == 1
+
+    async def test_counter_table_follows_inserts_and_deletes(self, db_session, monkeypatch, user_factory):
+        monkeypatch.setattr(settings, "USER_COUNT_MODE", "counter_table")
+        await db_session.run_sync(lambda session: sync_user_count_triggers(session.connection()))
+        counter = CounterTableCounter()
+        repo = UserRepository(db_session)
+        before = await counter.count(db_session)
+
+        await repo.bulk_create_users([user_factory.row(i, "Count") for i in range(5)])
+        assert await counter.count(db_session) == before + 5
+
+        await db_session.execute(text("DELETE FROM users WHERE first_name = 'Count0'"))
+        assert await counter.count(db_session) == before + 4
+
+    async def test_no_triggers_outside_counter_table_mode(self, db_session, monkeypatch, user_factory):
+        monkeypatch.setattr(settings, "USER_COUNT_MODE", "counter_table")
+        await db_session.run_sync(lambda session: sync_user_count_triggers(session.connection()))
+        monkeypatch.setattr(settings, "USER_COUNT_MODE", "cached")
+        await db_session.run_sync(lambda session: sync_user_count_triggers(session.connection()))
+
+        triggers = (await db_session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        )).scalars().all()
+        assert triggers == []
+        await UserRepository(db_session).bulk_create_users([user_factory.row(i, "Count") for i in range(2)])
+        assert await CounterTableCounter().count(db_session) == 0
+
+    async def test_estimate_falls_back_outside_postgres(self, db_session, user_factory):
+        await UserRepository(db_session).bulk_create_users([user_factory.row(i, "Count") for i in range(2)])
+        assert await EstimateCounter(fallback=ExactCounter()).count(db_session) == 2
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import text
+
+from app.database import Base, build_session_factory, create_engine_from_settings, get_pool_stats
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.mark.asyncio
+class TestConnectionPool:
+    async def test_pool_metrics(self, tmp_path):
+        engine = create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                during = get_pool_stats(engine)
+
+            after = get_pool_stats(engine)
+            assert during["checked_out"] == 1
+            assert after["checked_out"] == 0
+            assert after["checkouts"] == 1
+            assert after["wait_max_seconds"] >= 0
+        finally:
+            await engine.dispose()
+
+    async def test_pool_endpoint(self, test_client):
+        response = test_client.get("/system/pool")
+        assert response.status_code == 200
+        assert {"size", "checked_out", "overflow", "wait_max_seconds"} <= set(response.json())
+
+    async def test_sqlite_savepoint_keeps_outer_transaction(self, tmp_path, user_factory, monkeypatch):
+        engine = create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path}/savepoint.db")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            insert_rows = UserRepository._insert_rows
+            calls = 0
+
+            async def fail_second_chunk(self, *args):
+                nonlocal calls
+                calls += 1
+                if calls == 2:
+                    raise RuntimeError("chunk failed")
+                await insert_rows(self, *args)
+
+            monkeypatch.setattr(UserRepository, "_insert_rows", fail_second_chunk)
+            factory = build_session_factory(engine)
+            async with factory() as session:
+                with pytest.raises(RuntimeError):
+                    await UserRepository(session).bulk_create_users(
+                        [user_factory.row(i) for i in range(4)], chunk_size=2
+                    )
+
+            async with factory() as session:
+                assert await UserRepository(session).count_users() == 0
+        finally:
+            await engine.dispose()
@@ -0,0 +1,121 @@
+import json
+
+import pytest
+from fastapi import status
+from unittest.mock import patch
+
+from app.repositories.user_repository import UserRepository
+from app.services.random_user_service import RandomUserService
+
+
+@pytest.mark.asyncio
+class TestUpsert:
+    async def test_on_conflict_nothing(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        row = user_factory.row
+        await repo.bulk_create_users([row(1, "Dup", external_id="a"), row(2, "Dup", external_id="b")])
+
+        result = await repo.bulk_create_users([
+            row(3, "Dup", external_id="a"),
+            row(4, "Dup", external_id="c"),
+            row(5, "Dup", external_id="c"),
+            row(6, "Dup"),
+        ], on_conflict="nothing")
+        assert result.inserted == 2
+        assert result.duplicates == 2
+        assert result.failures == []
+        names = sorted(u.first_name for u in await repo.get_users())
+        assert names == ["Dup1", "Dup2", "Dup4", "Dup6"]
+
+    async def test_on_conflict_update(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        row = user_factory.row
+        existing = await repo.bulk_create_users([row(1, "Dup", external_id="a", city="Old")])
+
+        result = await repo.bulk_create_users([
+            row(2, "Dup", external_id="a", city="Mid"),
+            row(3, "Dup", external_id="a", city="New"),
+            row(4, "Dup", external_id="b"),
+        ], on_conflict="update")
+        assert result.duplicates == 1
+        assert (result.inserted, result.updated) == (1, 1)
+        assert existing.inserted_ids[0] not in result.inserted_ids
+        users = await repo.get_users()
+        assert len(users) == 2
+        updated = next(u for u in users if u.id == existing.inserted_ids[0])
+        await db_session.refresh(updated)
+        assert (updated.first_name, updated.city) == ("Dup3", "New")
+
+    async def test_on_conflict_error(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        row = user_factory.row
+        await repo.bulk_create_users([row(1, "Dup", external_id="a")])
+
+        result = await repo.bulk_create_users([row(2, "Dup", external_id="a"), row(3, "Dup", external_id="b")])
+        assert result.inserted == 1
+        assert [f.index for f in result.failures] == [0]
+
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_repeated_load_is_idempotent(self, mock_fetch, db_session, user_factory):
+        mock_fetch.return_value = [
+            *(user_factory.api(i, login={"uuid": f"uuid-{i}"}) for i in range(3)),
+            user_factory.api(9, login={"uuid": "uuid-0"}),
+        ]
+        service = RandomUserService(UserRepository(db_session))
+
+        first = await service.load_users(4)
+        second = await service.load_users(4)
+        assert (first.inserted, first.duplicates) == (3, 1)
+        assert (second.inserted, second.duplicates) == (0, 4)
+        assert await UserRepository(db_session).count_users() == 3
+
+    async def test_import_reports_duplicates(self, db_session, test_client, user_factory):
+        body = "\n".join(json.dumps(user_factory.row(i, "Dup", external_id=f"imp-{i % 2}")) for i in range(4))
+        data = test_client.post("/api/v1/users/import", content=body).json()
+        assert data["accepted"] == 2
+        assert data["duplicates"] == 2
+
+
+@pytest.mark.asyncio
+class TestDedupJob:
+    async def test_compacts_legacy_duplicates(self, db_session, test_client, monkeypatch, user_factory):
+        monkeypatch.setattr("app.config.settings.DEDUP_BATCH_SIZE", 2)
+        repo = UserRepository(db_session)
+        row = user_factory.row
+        result = await repo.bulk_create_users([
+            row(1, "Dup"),
+            row(1, "Dup", email="DUP1@test.com"),
+            row(2, "Dup"),
+            row(1, "Dup"),
+            row(2, "Dup", external_id="x"),
+            row(2, "Dup", external_id="y"),
+            row(3, "Dup"),
+        ])
+        ids = result.inserted_ids
+
+        response = test_client.post("/api/v1/users/dedup")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = test_client.get(f"/api/v1/jobs/{response.json()['id']}").json()
+        assert job["status"] == "finished"
+        assert job["result"] == {"scanned": 7, "deleted": 3}
+
+        remaining = sorted(u.id for u in await repo.get_users())
+        # Среди старых строк остаётся самая ранняя, строки с external_id не удаляются
+        assert remaining == [ids[0], ids[4], ids[5], ids[6]]
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestUpsertPostgres:
+    async def test_update_counts_inserts_and_updates_apart(self, pg_session, user_factory):
+        repo = UserRepository(pg_session)
+        row = user_factory.row
+        existing = await repo.bulk_create_users([row(1, "Dup", external_id="a"), row(2, "Dup", external_id="b")])
+
+        result = await repo.bulk_create_users(
+            [row(3, "Dup", external_id="a"), row(4, "Dup", external_id="c"), row(5, "Dup", external_id="b")],
+            on_conflict="update"
+        )
+        assert (result.inserted, result.updated) == (1, 2)
+        assert set(result.inserted_ids).isdisjoint(existing.inserted_ids)
+        assert await repo.count_users() == 3
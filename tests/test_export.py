@@ -0,0 +1,66 @@
+import asyncio
+import csv
+import io
+import json
+import pytest
+from fastapi import status
+
+from app.database import build_session_factory
+from app.repositories.user_repository import UserRepository
+from app.services.export import iter_copy_csv
+
+LOCATION = "Country: Spain\nCity: Madrid"
+
+
+@pytest.mark.asyncio
+class TestExport:
+    async def test_ndjson(self, db_session, test_client, user_factory):
+        ids = (await user_factory.create(UserRepository(db_session), 5, "Export", location=LOCATION)).inserted_ids
+
+        response = test_client.get("/api/v1/users/export")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == ids
+        assert rows[0]["location"] == LOCATION
+
+    async def test_csv(self, db_session, test_client, user_factory):
+        await user_factory.create(UserRepository(db_session), 3, "Export")
+
+        response = test_client.get("/api/v1/users/export", params={"format": "csv"})
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["first_name"] for row in rows] == ["Export0", "Export1", "Export2"]
+
+    async def test_resume_after_id(self, db_session, test_client, user_factory):
+        ids = (await user_factory.create(UserRepository(db_session), 5, "Export")).inserted_ids
+
+        response = test_client.get("/api/v1/users/export", params={"after_id": ids[2]})
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == ids[3:]
+
+    async def test_gzip(self, db_session, test_client, user_factory):
+        await user_factory.create(UserRepository(db_session), 4, "Export")
+
+        response = test_client.get("/api/v1/users/export", params={"gzip": True})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.text.splitlines()) == 4
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestCopyExportPostgres:
+    async def test_disconnect_releases_copy_task(self, pg_engine, pg_session, user_factory):
+        await user_factory.create(UserRepository(pg_session), 5000, "Export")
+        session_factory = build_session_factory(pg_engine)
+
+        stream = iter_copy_csv(session_factory)
+        assert (await anext(stream)).startswith(b"id,")
+        # Потребитель стоит, COPY успевает заполнить очередь
+        await asyncio.sleep(0.2)
+        await asyncio.wait_for(stream.aclose(), timeout=5)
+
+        # asyncpg сам отправляет CancelRequest отдельной задачей — смотрим только на свою
+        copies = [task for task in asyncio.all_tasks() if "iter_copy_csv" in task.get_coro().__qualname__]
+        assert copies == []
+        assert pg_engine.pool.checkedout() == 0
@@ -0,0 +1,105 @@
+import asyncio
+import httpx
+import pytest
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+from app.services.random_user_service import RandomUserService
+from app.services.user_sources import HttpUserSource, UserSource
+
+
+@pytest.fixture
+def results_callback(user_factory):
+    def callback(request: httpx.Request):
+        count = int(parse_qs(request.url.query.decode())["results"][0])
+        return httpx.Response(200, json={"results": [user_factory.api(i, "Fetched") for i in range(count)]})
+    return callback
+
+
+class FailingSource(UserSource):
+    page_size = 1
+
+    def __init__(self, fail_on: int, factory):
+        self.fail_on = fail_on
+        self.factory = factory
+        self.calls = 0
+
+    async def fetch(self, count):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("page failed")
+        await asyncio.sleep(0.01)
+        return [self.factory.api(self.calls, "Fetched")]
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "RANDOM_USER_PAGE_SIZE", 10)
+    monkeypatch.setattr(settings, "RANDOM_USER_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "RANDOM_USER_RETRY_BACKOFF", 0)
+
+
+@pytest.mark.asyncio
+class TestRandomUserFetcher:
+    async def test_large_count_is_split_into_pages(self, httpx_mock, small_pages, results_callback):
+        httpx_mock.add_callback(results_callback, is_reusable=True)
+        service = RandomUserService(UserRepository(None))
+
+        users = await service.fetch_users(25)
+
+        assert len(users) == 25
+        sizes = sorted(int(r.url.params["results"]) for r in httpx_mock.get_requests())
+        assert sizes == [5, 10, 10]
+
+    async def test_retries_rate_limited_page(self, httpx_mock, small_pages, results_callback):
+        httpx_mock.add_response(status_code=429, headers={"Retry-After": "0"})
+        httpx_mock.add_callback(results_callback)
+        service = RandomUserService(UserRepository(None))
+
+        users = await service.fetch_users(3)
+
+        assert len(users) == 3
+        assert len(httpx_mock.get_requests()) == 2
+
+    async def test_retry_after_is_capped(self, httpx_mock, small_pages, results_callback, monkeypatch):
+        monkeypatch.setattr(settings, "RANDOM_USER_MAX_BACKOFF", 0.01)
+        httpx_mock.add_response(status_code=503, headers={"Retry-After": "3600"})
+        httpx_mock.add_callback(results_callback)
+        service = RandomUserService(UserRepository(None))
+
+        users = await asyncio.wait_for(service.fetch_users(3), timeout=5)
+
+        assert len(users) == 3
+        monkeypatch.setattr(settings, "RANDOM_USER_RETRY_BACKOFF", 1)
+        assert HttpUserSource()._retry_delay(10) == 0.01
+
+    async def test_gives_up_after_max_retries(self, httpx_mock, small_pages, monkeypatch):
+        monkeypatch.setattr(settings, "RANDOM_USER_MAX_RETRIES", 1)
+        httpx_mock.add_response(status_code=503, is_reusable=True)
+        service = RandomUserService(UserRepository(None))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await service.fetch_users(3)
+        assert len(httpx_mock.get_requests()) == 2
+
+    async def test_load_users_pipeline_inserts_all_pages(self, httpx_mock, small_pages, db_session, results_callback):
+        httpx_mock.add_callback(results_callback, is_reusable=True)
+        repo = UserRepository(db_session)
+        service = RandomUserService(repo)
+
+        result = await service.load_users(35)
+
+        assert result.inserted == 35
+        assert result.failures == []
+        assert await repo.count_users() == 35
+
+    async def test_failed_page_cancels_other_fetches(self, small_pages, db_session, user_factory):
+        service = RandomUserService(UserRepository(db_session), source=FailingSource(fail_on=2, factory=user_factory))
+
+        with pytest.raises(RuntimeError, match="page failed"):
+            await asyncio.wait_for(service.load_users(20), timeout=5)
+
+        await asyncio.sleep(0)
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert pending == []
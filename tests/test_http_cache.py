@@ -0,0 +1,104 @@
+import pytest
+from fastapi import status
+from unittest.mock import patch
+
+from app.config import settings
+from app.http_cache import Version, VersionMap, etag_matches, get_version_map, version_ttl
+from app.repositories.user_repository import UserRepository
+
+
+class TestEtagMatches:
+    def test_lists_and_weak_tags(self):
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+
+class TestVersionMap:
+    def test_versions_expire(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: clock[0])
+        versions = VersionMap(ttl=60)
+        versions.set(("api", 1), Version('"a"', None))
+
+        clock[0] += 59
+        assert versions.get(("api", 1)) is not None
+        clock[0] += 2
+        assert versions.get(("api", 1)) is None
+
+    def test_ttl_bounded_by_max_age_and_user_cache(self, monkeypatch):
+        monkeypatch.setattr(settings, "HTTP_VERSION_MAP_TTL", 600.0)
+        monkeypatch.setattr(settings, "USER_CACHE_TTL", 120.0)
+        monkeypatch.setattr(settings, "HTTP_CACHE_CONTROL", "public, max-age=30")
+        assert version_ttl() == 30
+        monkeypatch.setattr(settings, "HTTP_CACHE_CONTROL", "no-cache")
+        assert version_ttl() == 120
+
+
+@pytest.mark.asyncio
+class TestConditionalGet:
+    @pytest.mark.parametrize("path", ["/api/v1/{id}", "/{id}"])
+    async def test_etag_round_trip(self, path, db_session, test_client, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(1, "Etag"))
+        url = path.format(id=user.id)
+
+        first = test_client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "public, max-age=300"
+        assert "last-modified" in first.headers
+
+        second = test_client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+        stale = test_client.get(url, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == status.HTTP_200_OK
+        assert stale.content == first.content
+
+    async def test_not_modified_skips_database(self, db_session, test_client, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(2, "Etag"))
+        etag = test_client.get(f"/api/v1/{user.id}").headers["etag"]
+
+        with patch("app.repositories.user_repository.UserRepository.get_user") as get_user:
+            response = test_client.get(f"/api/v1/{user.id}", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        get_user.assert_not_called()
+
+    async def test_if_modified_since(self, db_session, test_client, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(3, "Etag"))
+        last_modified = test_client.get(f"/api/v1/{user.id}").headers["last-modified"]
+
+        response = test_client.get(f"/api/v1/{user.id}", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        old = test_client.get(
+            f"/api/v1/{user.id}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+        )
+        assert old.status_code == status.HTTP_200_OK
+
+    async def test_write_invalidates_versions(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(4, "Etag"))
+        test_client.get(f"/api/v1/{user.id}")
+        assert get_version_map().get(("api", user.id)) is not None
+
+        await repo.create_user(user_factory.row(5, "Etag"))
+        assert get_version_map().get(("api", user.id)) is None
+
+    async def test_backfill_bumps_updated_at(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user({**user_factory.row(6, "Etag"), "city": None, "location": "City: Bergen"})
+        before = test_client.get(f"/api/v1/{user.id}").json()
+
+        job = test_client.post("/api/v1/users/location/backfill").json()
+        assert test_client.get(f"/api/v1/jobs/{job['id']}").json()["status"] == "finished"
+
+        # Backfill писал через другую сессию, а db_session держит старые объекты
+        db_session.expire_all()
+        after = test_client.get(f"/api/v1/{before['id']}").json()
+        assert after["city"] == "Bergen"
+        assert after["updated_at"] is not None
+        assert after["updated_at"] >= before["updated_at"]
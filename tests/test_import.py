@@ -0,0 +1,85 @@
+import gzip
+import json
+import pytest
+from fastapi import status
+
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+from app.services.importer import import_users
+
+
+@pytest.mark.asyncio
+class TestImport:
+    async def test_ndjson(self, db_session, test_client, monkeypatch, user_factory):
+        monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+        lines = [json.dumps(user_factory.row(i, "Import")) for i in range(5)]
+        lines.insert(2, "{not json")
+        lines.insert(4, json.dumps({"first_name": "NoEmail"}))
+
+        response = test_client.post("/api/v1/users/import", content="\n".join(lines))
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["accepted"] == 5
+        assert data["rejected"] == 2
+        assert [e["index"] for e in data["errors"]] == [3, 5]
+        assert await UserRepository(db_session).count_users() == 5
+
+    async def test_csv_roundtrip_with_export(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await user_factory.create(repo, 3, "Import", location="Country: Chile\nCity: Santiago")
+        exported = test_client.get("/api/v1/users/export", params={"format": "csv"}).content
+
+        response = test_client.post(
+            "/api/v1/users/import", params={"format": "csv"}, content=exported
+        )
+        assert response.json() == {"accepted": 3, "rejected": 0, "duplicates": 0, "updated": 0, "errors": []}
+        users = await repo.get_users()
+        assert len(users) == 6
+        assert users[-1].location == "Country: Chile\nCity: Santiago"
+
+    async def test_gzip_body(self, db_session, test_client, user_factory):
+        body = gzip.compress("\n".join(json.dumps(user_factory.row(i, "Import")) for i in range(4)).encode())
+
+        response = test_client.post(
+            "/api/v1/users/import", content=body, headers={"Content-Encoding": "gzip"}
+        )
+        assert response.json()["accepted"] == 4
+
+    async def test_gzip_bomb_rejected(self, test_client, monkeypatch):
+        monkeypatch.setattr(settings, "IMPORT_MAX_DECOMPRESSED_BYTES", 100_000)
+        body = gzip.compress(b"\n" * 10_000_000)
+
+        response = test_client.post(
+            "/api/v1/users/import", content=body, headers={"Content-Encoding": "gzip"}
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+    async def test_csv_column_mismatch(self, test_client):
+        body = "first_name,last_name\nA,B,C\n"
+        response = test_client.post("/api/v1/users/import", params={"format": "csv"}, content=body)
+        data = response.json()
+        assert data["accepted"] == 0
+        assert data["rejected"] == 1
+
+
+async def body(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestImportPostgres:
+    # "error" идёт через COPY, остальные режимы — через INSERT
+    @pytest.mark.parametrize("on_conflict", ["error", "nothing"])
+    async def test_row_failing_in_database_is_rejected(self, pg_session, monkeypatch, on_conflict, user_factory):
+        monkeypatch.setattr(settings, "INGEST_ON_CONFLICT", on_conflict)
+        records = [user_factory.row(0, "Import"), user_factory.row(1, "Import", gender="x" * 50), user_factory.row(2, "Import")]
+        content = "\n".join(json.dumps(record) for record in records).encode()
+
+        result = await import_users(UserRepository(pg_session), body(content))
+
+        assert result.accepted == 2
+        assert result.rejected == 1
+        assert result.errors[0].index == 2
+        assert await UserRepository(pg_session).count_users() == 2
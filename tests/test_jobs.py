@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from fastapi import status
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.repositories.user_repository import UserRepository
+from app.services.jobs import JobManager
+
+
+@pytest.mark.asyncio
+class TestLoadUsersJob:
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_load_users_runs_as_job(self, mock_fetch, test_client, db_session, user_factory):
+        mock_fetch.return_value = [user_factory.api(i, "Job") for i in range(3)]
+
+        response = test_client.post("/load-users", data={"count": 3}, follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        job_id = response.headers["location"].split("job=")[1]
+
+        job = test_client.get(f"/api/v1/jobs/{job_id}").json()
+        assert job["status"] == "finished"
+        assert job["progress"] == 3
+        assert job["result"] == {"inserted": 3, "duplicates": 0, "updated": 0, "failed": 0}
+        assert await UserRepository(db_session).count_users() == 3
+
+        response = test_client.get(f"/?job={job_id}")
+        assert "Loading users: finished" in response.text
+
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_failed_job_reports_error(self, mock_fetch, test_client):
+        mock_fetch.side_effect = RuntimeError("API is down")
+
+        response = test_client.post("/load-users", data={"count": 3}, follow_redirects=False)
+        job_id = response.headers["location"].split("job=")[1]
+
+        job = test_client.get(f"/api/v1/jobs/{job_id}").json()
+        assert job["status"] == "failed"
+        assert job["error"] == "API is down"
+
+    async def test_invalid_count_reads_one_page(self, test_client):
+        with patch.object(UserRepository, "get_users") as get_users, \
+                patch.object(UserRepository, "get_users_page") as get_users_page:
+            get_users_page.return_value.items = []
+            response = test_client.post("/load-users", data={"count": 6000})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        get_users.assert_not_called()
+        get_users_page.assert_called_once_with(limit=20)
+
+    async def test_unknown_job(self, test_client):
+        response = test_client.get("/api/v1/jobs/missing")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_job_state_is_shared_between_workers(self, db_session):
+        session_factory = sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+        worker, other_worker = JobManager(progress_interval=0.01), JobManager()
+        job = await worker.create(session_factory, "load_users", total=2)
+        assert (await other_worker.get(db_session, job.id)).status == "pending"
+
+        seen = {}
+
+        async def work(job):
+            job.progress = 1
+            await asyncio.sleep(0.1)
+            seen["running"] = await other_worker.get(db_session, job.id)
+            job.progress = 2
+            return {"inserted": 2}
+
+        await worker.run(job, work, session_factory)
+
+        assert seen["running"].status == "running"
+        assert seen["running"].progress == 1
+        finished = await other_worker.get(db_session, job.id)
+        assert finished.status == "finished"
+        assert finished.progress == 2
+        assert finished.result == {"inserted": 2}
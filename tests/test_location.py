@@ -0,0 +1,133 @@
+import pytest
+from fastapi import status
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.location import format_location, parse_location
+from app.migrations import run_migrations
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import User as UserSchema
+from app.services.random_user_service import RandomUserService
+
+LEGACY = "Country: Norway\nState: Oslo\nCity: Oslo\nStreet: 12 Karl Johans gate"
+
+
+class TestParseLocation:
+    def test_round_trip(self):
+        fields = {
+            "country": "Norway", "state": "Oslo", "city": "Oslo",
+            "street_number": 12, "street_name": "Karl Johans gate"
+        }
+        assert format_location(**fields) == LEGACY
+        assert parse_location(LEGACY) == fields
+
+    def test_missing_parts(self):
+        parsed = parse_location("Country: N/A\nState: N/A\nCity: Bergen\nStreet: N/A N/A")
+        assert parsed == {"city": "Bergen"}
+
+    def test_free_text(self):
+        assert parse_location("New York") == {}
+
+
+@pytest.mark.asyncio
+class TestStructuredLocation:
+    async def test_ingest_skips_text_blob(self, db_session):
+        service = RandomUserService(UserRepository(db_session))
+        row = service._transform_user_data({
+            "gender": "male",
+            "name": {"first": "Ola", "last": "Nordmann"},
+            "email": "ola@test.com",
+            "phone": "1",
+            "location": {
+                "country": "Norway", "city": "Bergen",
+                "street": {"number": 5, "name": "Bryggen"},
+                "coordinates": {"latitude": "60.39", "longitude": "5.32"}
+            },
+            "picture": {"thumbnail": "http://test.com/ola.jpg"}
+        })
+        assert "location" not in row
+        assert row["latitude"] == 60.39
+        assert row["longitude"] == 5.32
+
+    async def test_computed_location(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(
+            1, "Legacy", location=None, country="Norway", city="Bergen", latitude=60.39, longitude=5.32
+        ))
+
+        data = test_client.get(f"/api/v1/{user.id}").json()
+        assert data["country"] == "Norway"
+        assert data["latitude"] == 60.39
+        assert data["location"] == "Country: Norway\nState: N/A\nCity: Bergen\nStreet: N/A N/A"
+
+        page = test_client.get(f"/{user.id}")
+        assert "City: Bergen<br>" in page.text
+
+    async def test_legacy_location_passthrough(self, db_session, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(1, "Legacy", location="New York"))
+        assert UserSchema.model_validate(user).location == "New York"
+
+
+@pytest.mark.asyncio
+class TestBackfill:
+    async def test_backfill_job(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await repo.bulk_create_users(
+            [user_factory.row(i, "Legacy", location=LEGACY) for i in range(5)]
+            + [user_factory.row(5, "Legacy", location="New York")]
+        )
+        await repo.create_user(user_factory.row(6, "Legacy", location=LEGACY, country="Sweden"))
+
+        response = test_client.post("/api/v1/users/location/backfill")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        job = test_client.get(f"/api/v1/jobs/{response.json()['id']}").json()
+        assert job["status"] == "finished"
+        assert job["result"] == {"scanned": 7, "updated": 6}
+
+        users = {u.first_name: u for u in await repo.get_users()}
+        for user in users.values():
+            await db_session.refresh(user)
+        assert users["Legacy0"].location is None
+        assert users["Legacy0"].city == "Oslo"
+        assert users["Legacy0"].street_number == 12
+        assert users["Legacy5"].location == "New York"
+        # Уже заполненная колонка не перезаписывается
+        assert users["Legacy6"].country == "Sweden"
+        assert users["Legacy6"].state == "Oslo"
+
+        data = test_client.get(f"/api/v1/{users['Legacy0'].id}").json()
+        assert data["location"] == LEGACY
+
+    async def test_search_by_city(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await repo.bulk_create_users([
+            user_factory.row(i, "Legacy", location=None, country="Norway", state="Vestland", city=city)
+            for i, city in enumerate(["Bergen", "Voss", "Bergen"])
+        ])
+
+        data = test_client.get("/api/v1/users/search?country=Norway&city=Bergen").json()
+        assert [u["first_name"] for u in data["items"]] == ["Legacy0", "Legacy2"]
+
+
+@pytest.mark.asyncio
+class TestLocationMigration:
+    async def test_adds_coordinates(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, gender VARCHAR(10), "
+                "first_name VARCHAR(50), last_name VARCHAR(50), email VARCHAR(100), "
+                "phone VARCHAR(30), location TEXT, picture_url TEXT)"
+            ))
+
+        await run_migrations(engine)
+
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(lambda c: {col["name"] for col in inspect(c).get_columns("users")})
+            indexes = set((await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index'")
+            )).scalars())
+        assert {"latitude", "longitude"} <= columns
+        assert "ix_users_location" in indexes
+        await engine.dispose()
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from fastapi import BackgroundTasks, FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from unittest.mock import patch
+
+from app.config import settings
+from app.metrics import (
+    DB_QUERY_DURATION,
+    HTTP_REQUEST_DURATION,
+    INGEST_STAGE_DURATION,
+    Histogram,
+    MetricsMiddleware,
+    REGISTRY,
+    instrument_engine,
+)
+from app.repositories.user_repository import UserRepository
+from app.services.random_user_service import RandomUserService
+
+
+class TestHistogram:
+    def test_renders_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Тестовая гистограмма", ("route",), buckets=(0.1, 1.0))
+        REGISTRY.remove(histogram)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, '/a"b')
+
+        assert histogram.render().splitlines() == [
+            "# HELP test_seconds Тестовая гистограмма",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+            'test_seconds_bucket{route="/a\\"b",le="1"} 3',
+            'test_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+            'test_seconds_sum{route="/a\\"b"} 3.65',
+            'test_seconds_count{route="/a\\"b"} 4',
+        ]
+
+    def test_disabled_records_nothing(self, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+        histogram = Histogram("test_disabled_seconds", "Выключено")
+        REGISTRY.remove(histogram)
+        histogram.observe(0.1)
+        assert histogram.count() == 0
+
+
+@pytest.mark.asyncio
+class TestMetricsEndpoint:
+    async def test_request_latency_by_route(self, test_client):
+        before = HTTP_REQUEST_DURATION.count("GET", "/api/v1/{user_id}", "404")
+        test_client.get("/api/v1/999999")
+        test_client.get("/api/v1/999998")
+        assert HTTP_REQUEST_DURATION.count("GET", "/api/v1/{user_id}", "404") == before + 2
+
+        response = test_client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'route="/api/v1/{user_id}",status="404",le="+Inf"' in response.text
+        assert 'db_pool_connections{state="checked_out"}' in response.text
+
+    async def test_background_tasks_not_in_latency(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/slow-background")
+        async def slow_background(background_tasks: BackgroundTasks):
+            background_tasks.add_task(asyncio.sleep, 0.5)
+            return {}
+
+        labels = ("GET", "/slow-background", "200")
+        before = HTTP_REQUEST_DURATION.series.get(labels, [None, 0.0])[1]
+        assert TestClient(app).get("/slow-background").status_code == status.HTTP_200_OK
+
+        assert HTTP_REQUEST_DURATION.count(*labels) >= 1
+        assert HTTP_REQUEST_DURATION.series[labels][1] - before < 0.5
+
+    async def test_disabled(self, test_client, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+        assert test_client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_query_timings(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine)
+        before = DB_QUERY_DURATION.count("SELECT")
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.execute(text("  select 2"))
+        await engine.dispose()
+        assert DB_QUERY_DURATION.count("SELECT") == before + 2
+
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_ingest_stages(self, mock_fetch, db_session, test_client, user_factory):
+        mock_fetch.return_value = [user_factory.api(i, "Metric") for i in range(3)]
+        before = {stage: INGEST_STAGE_DURATION.count(stage) for stage in ("fetch", "transform", "insert")}
+
+        await RandomUserService(UserRepository(db_session)).load_users(3)
+
+        assert all(INGEST_STAGE_DURATION.count(stage) == count + 1 for stage, count in before.items())
+        text_metrics = test_client.get("/metrics").text
+        assert 'ingest_rows_total{result="inserted"}' in text_metrics
+        assert "ingest_rows_per_second " in text_metrics
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from unittest.mock import patch
+
+from app.cache import PageCache
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+from app.templating import build_environment, get_page_cache, precompile_templates
+
+
+class TestPageCache:
+    def test_bounded_by_bytes(self):
+        cache = PageCache(max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        assert cache.get("a") is not None
+        cache.set("c", b"123")
+        # "b" — самая давняя по использованию
+        assert cache.get("b") is None
+        assert cache.size == 8
+        assert cache.stats.evictions == 1
+
+        cache.set("huge", b"x" * 11)
+        assert cache.get("huge") is None
+
+    def test_ttl(self):
+        cache = PageCache(ttl=-1)
+        cache.set("a", b"body")
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+
+class TestTemplates:
+    def test_precompile_writes_bytecode(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", str(tmp_path))
+        env = build_environment()
+        for name in env.list_templates(extensions=["html"]):
+            env.get_template(name)
+        assert len(os.listdir(tmp_path)) == 3
+        assert precompile_templates() == 3
+
+
+@pytest.mark.asyncio
+class TestCachedPages:
+    async def test_index_cached_until_change(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await repo.create_user(user_factory.row(1, "Page"))
+        assert "Page1" in test_client.get("/").text
+
+        with patch("app.routers.frontend.UserRepository.get_users_page") as get_page:
+            assert "Page1" in test_client.get("/").text
+        get_page.assert_not_called()
+
+        await repo.create_user(user_factory.row(2, "Page"))
+        assert "Page2" in test_client.get("/").text
+
+    async def test_job_page_not_cached(self, db_session, test_client, user_factory):
+        await UserRepository(db_session).create_user(user_factory.row(3, "Page"))
+        test_client.get("/?job=missing")
+        assert get_page_cache().get(("index", 1)) is None
+
+    async def test_user_page_cached(self, db_session, test_client, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(4, "Page"))
+        first = test_client.get(f"/{user.id}")
+
+        with patch("app.routers.frontend.CachedUserRepository.get_user") as get_user:
+            second = test_client.get(f"/{user.id}")
+        get_user.assert_not_called()
+        assert second.text == first.text
+        assert second.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import status
+
+from app.repositories.user_repository import UserRepository
+
+
+@pytest.mark.asyncio
+class TestKeysetPagination:
+    async def test_walk_forward_and_back(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        await user_factory.create(repo, 25, "Page")
+
+        first = await repo.get_users_page(limit=10)
+        assert [u.first_name for u in first.items][:2] == ["Page0", "Page1"]
+        assert first.prev_cursor is None
+
+        second = await repo.get_users_page(limit=10, cursor=first.next_cursor)
+        assert second.items[0].first_name == "Page10"
+        assert second.page == 2
+
+        third = await repo.get_users_page(limit=10, cursor=second.next_cursor)
+        assert len(third.items) == 5
+        assert third.next_cursor is None
+
+        back = await repo.get_users_page(limit=10, cursor=third.prev_cursor)
+        assert [u.id for u in back.items] == [u.id for u in second.items]
+        assert back.page == 2
+
+    async def test_invalid_cursor(self, db_session):
+        repo = UserRepository(db_session)
+        with pytest.raises(ValueError):
+            await repo.get_users_page(cursor="not-a-cursor")
+
+    async def test_api_list_users(self, db_session, test_client, user_factory):
+        await user_factory.create(UserRepository(db_session), 15, "Page")
+
+        response = test_client.get("/api/v1/users", params={"limit": 10})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["items"]) == 10
+        assert data["prev_cursor"] is None
+
+        response = test_client.get("/api/v1/users", params={"limit": 10, "cursor": data["next_cursor"]})
+        data = response.json()
+        assert len(data["items"]) == 5
+        assert data["items"][0]["first_name"] == "Page10"
+        assert data["next_cursor"] is None
+
+        response = test_client.get("/api/v1/users", params={"cursor": "garbage"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_index_page_cursor_links(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await user_factory.create(repo, 45, "Page")
+
+        response = test_client.get("/?page=2")
+        assert "Page20" in response.text
+        page = await repo.get_users_page(limit=20, offset=20)
+        assert f"/?cursor={page.next_cursor}" in response.text
+
+        response = test_client.get(f"/?cursor={page.next_cursor}")
+        assert response.status_code == status.HTTP_200_OK
+        assert "Page40" in response.text
+        assert "Page39" not in response.text
+        assert "Page 3 of 3" in response.text
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import time
+
+import httpx
+import pytest
+from fastapi import status
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.repositories.user_repository import UserRepository
+from app.services.pictures import PictureDownloader, PictureStore, get_picture_store, sniff_media_type
+from app.services.random_user_service import RandomUserService
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def png(i, size=100):
+    return PNG + str(i).encode().ljust(size - len(PNG), b".")
+
+
+def image_server(request: httpx.Request):
+    # Локальная замена CDN randomuser.me: /missing — 404, /text — не картинка
+    name = request.url.path.rsplit("/", 1)[-1]
+    if name == "missing.jpg":
+        return httpx.Response(404)
+    if name == "text.jpg":
+        return httpx.Response(200, content=b"<html>not an image</html>")
+    if name == "huge.jpg":
+        return httpx.Response(200, content=png("huge", size=1_000_000))
+    return httpx.Response(200, content=png(name.split(".")[0]))
+
+
+@pytest.fixture
+def api_server(user_factory):
+    def callback(request: httpx.Request):
+        if request.url.host == "img.test":
+            return image_server(request)
+        count = int(parse_qs(request.url.query.decode())["results"][0])
+        return httpx.Response(200, json={"results": [
+            user_factory.api(i, "Pic", login={"uuid": f"pic-{i}"}, picture={"thumbnail": f"http://img.test/{i % 2}.jpg"})
+            for i in range(count)
+        ]})
+    return callback
+
+
+def age(path, seconds):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def picture_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PICTURE_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "PICTURE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("app.services.pictures._store", None)
+    return get_picture_store()
+
+
+class TestPictureStore:
+    def test_content_addressed(self, tmp_path):
+        store = PictureStore(str(tmp_path), max_bytes=1000)
+        first = store.put(png(1))
+        assert first == hashlib.sha256(png(1)).hexdigest()
+        assert store.put(png(1)) == first
+        assert store.get(first).read_bytes() == png(1)
+        assert store.size == 100
+        assert store.get("../etc/passwd") is None
+
+    def test_evicts_least_recently_served(self, tmp_path):
+        store = PictureStore(str(tmp_path), max_bytes=250)
+        a, b = store.put(png("a")), store.put(png("b"))
+        age(store.path(a), 7200)
+        age(store.path(b), 10800)
+        # Чтение обновляет mtime, поэтому a переживает b
+        store.get(a)
+
+        c = store.put(png("c"))
+        assert store.get(b) is None
+        assert store.get(a) is not None and store.get(c) is not None
+        assert store.size == 200
+        assert PictureStore(str(tmp_path), max_bytes=250).size == 200
+
+
+class TestSniffMediaType:
+    def test_webp_needs_webp_form_type(self):
+        assert sniff_media_type(b"RIFF\x10\x00\x00\x00WEBP") == "image/webp"
+        assert sniff_media_type(b"RIFF\x10\x00\x00\x00WAVE") is None
+        assert sniff_media_type(PNG + b"....") == "image/png"
+
+
+@pytest.mark.asyncio
+class TestPictureDownloader:
+    async def test_downloads_unique_images(self, httpx_mock, tmp_path):
+        httpx_mock.add_callback(image_server, is_reusable=True)
+        store = PictureStore(str(tmp_path), max_bytes=10000)
+
+        hashes = await PictureDownloader(store, concurrency=2).download([
+            "http://img.test/1.jpg", "http://img.test/2.jpg", "http://img.test/1.jpg",
+            "http://img.test/missing.jpg", "http://img.test/text.jpg",
+        ])
+        assert set(hashes) == {"http://img.test/1.jpg", "http://img.test/2.jpg"}
+        assert len(httpx_mock.get_requests()) == 4
+        assert store.get(hashes["http://img.test/2.jpg"]).read_bytes() == png(2)
+
+    async def test_oversized_image_is_skipped(self, httpx_mock, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "PICTURE_MAX_FILE_BYTES", 1000)
+        httpx_mock.add_callback(image_server, is_reusable=True)
+        store = PictureStore(str(tmp_path), max_bytes=10_000_000)
+
+        hashes = await PictureDownloader(store).download(["http://img.test/huge.jpg", "http://img.test/1.jpg"])
+        assert list(hashes) == ["http://img.test/1.jpg"]
+
+    async def test_store_errors_fall_back_to_original(self, httpx_mock, tmp_path, monkeypatch):
+        httpx_mock.add_callback(image_server, is_reusable=True)
+        store = PictureStore(str(tmp_path), max_bytes=10000)
+
+        def disk_full(data):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(store, "put", disk_full)
+        assert await PictureDownloader(store).download(["http://img.test/1.jpg"]) == {}
+
+    async def test_load_users_stores_pictures(self, httpx_mock, picture_cache, db_session, test_client, api_server):
+        httpx_mock.add_callback(api_server, is_reusable=True)
+        result = await RandomUserService(UserRepository(db_session)).load_users(4)
+        assert result.inserted == 4
+
+        users = await UserRepository(db_session).get_users()
+        assert {u.picture_hash for u in users} == {
+            hashlib.sha256(png(0)).hexdigest(), hashlib.sha256(png(1)).hexdigest()
+        }
+        assert f"/pictures/{users[0].picture_hash}" in test_client.get("/").text
+
+
+@pytest.mark.asyncio
+class TestPictureRoute:
+    async def test_serves_with_long_lived_cache(self, picture_cache, test_client):
+        picture_hash = picture_cache.put(png(1))
+
+        response = test_client.get(f"/pictures/{picture_hash}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == png(1)
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["etag"] == f'"{picture_hash}"'
+        assert "immutable" in response.headers["cache-control"]
+
+        response = test_client.get(f"/pictures/{picture_hash}", headers={"If-None-Match": f'"{picture_hash}"'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    async def test_evicted_picture_redirects_to_original(self, picture_cache, db_session, test_client, user_factory):
+        picture_hash = hashlib.sha256(b"gone").hexdigest()
+        await UserRepository(db_session).bulk_create_users([
+            user_factory.row(0, "Gone", picture_url="http://img.test/gone.jpg", picture_hash=picture_hash)
+        ])
+
+        response = test_client.get(f"/pictures/{picture_hash}", follow_redirects=False)
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.headers["location"] == "http://img.test/gone.jpg"
+
+        response = test_client.get(f"/pictures/{'0' * 64}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_picture_removed_before_open_redirects(self, picture_cache, db_session, test_client, monkeypatch, user_factory):
+        picture_hash = picture_cache.put(png(2))
+        await UserRepository(db_session).bulk_create_users([
+            user_factory.row(0, "Raced", picture_url="http://img.test/2.jpg", picture_hash=picture_hash)
+        ])
+        path = picture_cache.get(picture_hash)
+        # Вытеснение между store.get и открытием файла
+        monkeypatch.setattr(picture_cache, "get", lambda _: path)
+        path.unlink()
+
+        response = test_client.get(f"/pictures/{picture_hash}", follow_redirects=False)
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.headers["location"] == "http://img.test/2.jpg"
+
+    async def test_import_cannot_set_picture_hash(self, db_session, test_client):
+        record = {
+            "gender": "male", "first_name": "Forged", "last_name": "User", "email": "forged@test.com",
+            "phone": "0", "picture_url": "http://img.test/forged.jpg", "picture_hash": "f" * 64,
+        }
+        response = test_client.post("/api/v1/users/import", content=json.dumps(record))
+        assert response.json()["accepted"] == 1
+
+        users = await UserRepository(db_session).get_users()
+        assert [u.picture_hash for u in users] == [None]
@@ -0,0 +1,93 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base, build_session_factory
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path, user_factory):
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/{name}.db")
+        for name in ("primary", "replica_a", "replica_b")
+    ]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # Маркер, по которому видно, из какой базы пришло чтение
+            await conn.execute(insert(User), [user_factory.row(0, "Replica", first_name=engine.url.database.split("/")[-1][:-3])])
+    yield engines
+    for engine in engines:
+        await engine.dispose()
+
+
+async def reader_name(factory):
+    async with factory() as session:
+        return (await UserRepository(session).get_user(1)).first_name
+
+
+@pytest.mark.asyncio
+class TestReplicaRouting:
+    async def test_reads_round_robin_across_replicas(self, databases):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas)
+
+        names = [await reader_name(factory) for _ in range(4)]
+        assert names == ["replica_a", "replica_b", "replica_a", "replica_b"]
+
+    async def test_writes_go_to_primary(self, databases, user_factory):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas)
+
+        async with factory() as session:
+            result = await UserRepository(session).bulk_create_users([user_factory.row(0, "Replica", first_name="Written")])
+
+        async with build_session_factory(primary)() as session:
+            assert (await UserRepository(session).get_user(result.inserted_ids[0])).first_name == "Written"
+        for replica in replicas:
+            async with build_session_factory(replica)() as session:
+                assert await UserRepository(session).get_user(result.inserted_ids[0]) is None
+
+    async def test_read_your_writes_window(self, databases, user_factory):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas, read_your_writes=60)
+        assert await reader_name(factory) == "replica_a"
+
+        async with factory() as session:
+            await UserRepository(session).bulk_create_users([user_factory.row(0, "Replica", first_name="Fresh")])
+
+        assert await reader_name(factory) == "primary"
+
+    async def test_least_latency(self, databases):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas, selection="least_latency")
+        router = factory.kw["info"]["router"]
+        router.latency[replicas[0].sync_engine] = 1.0
+
+        assert await reader_name(factory) == "replica_b"
+
+    async def test_session_pinned_to_one_replica(self, databases):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas)
+
+        async with factory() as session:
+            repo = UserRepository(session)
+            names = [(await repo.get_user(1)).first_name for _ in range(3)]
+        assert names == ["replica_a"] * 3
+        assert await reader_name(factory) == "replica_b"
+
+    async def test_textual_reads_do_not_open_write_window(self, databases):
+        primary, *replicas = databases
+        factory = build_session_factory(primary, replicas, read_your_writes=60)
+        router = factory.kw["info"]["router"]
+        query = "SELECT first_name FROM users WHERE id = 1"
+
+        async with factory() as session:
+            assert (await session.execute(text(query))).scalar() == "primary"
+            marked = text(query).execution_options(readonly=True)
+            assert (await session.execute(marked)).scalar() == "replica_a"
+        assert session.info.get("wrote") is None
+        assert router.reader() is not router.primary
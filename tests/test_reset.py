@@ -0,0 +1,94 @@
+import pytest
+from fastapi import status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.migrations import sync_user_count_triggers
+from app.models.user import User
+from app.repositories.counting import CounterTableCounter
+from app.repositories.user_repository import UserRepository
+from app.services.reset import reset_users
+
+
+def job_id_from(response):
+    return response.headers["location"].split("job=")[1]
+
+
+@pytest.mark.asyncio
+class TestResetJob:
+    @pytest.mark.parametrize("mode", ["batched", "truncate", "auto"])
+    async def test_reset_modes(self, mode, db_session, test_client, monkeypatch, user_factory):
+        monkeypatch.setattr("app.config.settings.RESET_BATCH_SIZE", 2)
+        repo = UserRepository(db_session)
+        result = await repo.bulk_create_users([user_factory.row(i, "Reset") for i in range(5)])
+        user_id = result.inserted_ids[0]
+        # Прогреваем кэши, которые должны сброситься
+        assert test_client.get(f"/api/v1/{user_id}").status_code == status.HTTP_200_OK
+        assert "Reset0" in test_client.get("/").text
+
+        response = test_client.post(f"/api/v1/users/reset?mode={mode}")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        job = test_client.get(f"/api/v1/jobs/{response.json()['id']}").json()
+        assert job["status"] == "finished"
+        assert job["result"]["deleted"] == 5
+        assert job["progress"] == job["total"] == 5
+        assert job["result"]["mode"] == ("batched" if mode == "auto" else mode)
+
+        assert await repo.count_users() == 0
+        assert await CounterTableCounter().count(db_session) == 0
+        assert test_client.get(f"/api/v1/{user_id}").status_code == status.HTTP_404_NOT_FOUND
+        assert "Reset0" not in test_client.get("/").text
+
+    async def test_swap_requires_postgresql(self, test_client):
+        response = test_client.post("/api/v1/users/reset?mode=swap")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_admin_clear_runs_job(self, db_session, test_client, user_factory):
+        repo = UserRepository(db_session)
+        await repo.bulk_create_users([user_factory.row(i, "Reset") for i in range(3)])
+
+        response = test_client.get("/admin/clear", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+        page = test_client.get(f"/?job={job_id_from(response)}")
+        assert "Clearing users: finished (3/3)" in page.text
+        assert await repo.count_users() == 0
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestSwapReset:
+    async def test_swap_replaces_table(self, pg_engine, monkeypatch, user_factory):
+        monkeypatch.setattr(settings, "USER_COUNT_MODE", "counter_table")
+        async with pg_engine.begin() as conn:
+            await conn.run_sync(sync_user_count_triggers)
+        factory = sessionmaker(bind=pg_engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            await UserRepository(session).bulk_create_users([user_factory.row(i, "Reset") for i in range(5)])
+            indexes_before = set((await session.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = 'users'")
+            )).scalars())
+
+        result = await reset_users(factory, "swap")
+
+        assert result == {"mode": "swap", "deleted": 5}
+        async with factory() as session:
+            tables = set((await session.execute(
+                text("SELECT tablename FROM pg_tables WHERE schemaname = current_schema()")
+            )).scalars())
+            assert not any(name.startswith("users_old_") for name in tables)
+            indexes_after = set((await session.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = 'users'")
+            )).scalars())
+            assert indexes_after == indexes_before
+
+            repo = UserRepository(session)
+            assert await repo.count_users() == 0
+            inserted = await repo.bulk_create_users([user_factory.row(i, "Reset") for i in range(2)])
+            # Новая последовательность начинается с 1, триггеры счётчика на месте
+            assert inserted.inserted_ids == [1, 2]
+            assert await CounterTableCounter().count(session) == 2
+            assert (await session.get(User, 1)).first_name == "Reset0"
@@ -0,0 +1,121 @@
+import random
+import pytest
+from sqlalchemy import text
+
+from app.repositories.user_repository import UserRepository
+from app.repositories.sampling import (
+    IdRangeSampler,
+    OrderByRandomSampler,
+    ReservoirSampler,
+    TableSampleSampler,
+)
+
+
+@pytest.mark.asyncio
+class TestRandomSamplers:
+    @pytest.mark.parametrize("sampler_cls", [
+        OrderByRandomSampler, IdRangeSampler, TableSampleSampler, ReservoirSampler
+    ])
+    async def test_pick_returns_existing_user(self, db_session, sampler_cls, user_factory):
+        repo = UserRepository(db_session, sampler=sampler_cls())
+        ids = (await user_factory.create(repo, 10, "Sample")).inserted_ids
+
+        user = await repo.get_random_user()
+        assert user is not None
+        assert user.id in ids
+
+    @pytest.mark.parametrize("sampler_cls", [
+        OrderByRandomSampler, IdRangeSampler, TableSampleSampler, ReservoirSampler
+    ])
+    async def test_pick_from_empty_table(self, db_session, sampler_cls):
+        await db_session.execute(text("DELETE FROM users"))
+        repo = UserRepository(db_session, sampler=sampler_cls())
+        assert await repo.get_random_user() is None
+
+    async def test_id_range_survives_gaps(self, db_session, user_factory):
+        repo = UserRepository(db_session, sampler=IdRangeSampler(rng=random.Random(1)))
+        ids = (await user_factory.create(repo, 20, "Sample")).inserted_ids
+        kept = {ids[0], ids[-1]}
+        await db_session.execute(
+            text("DELETE FROM users WHERE id NOT IN (:a, :b)"),
+            {"a": ids[0], "b": ids[-1]}
+        )
+
+        for _ in range(10):
+            user = await repo.get_random_user()
+            assert user.id in kept
+
+    async def test_sample_ids_are_distinct(self, db_session, user_factory):
+        sampler = IdRangeSampler(rng=random.Random(2))
+        ids = (await user_factory.create(UserRepository(db_session, sampler=sampler), 15, "Sample")).inserted_ids
+
+        sampled = await sampler.sample_ids(db_session, 10)
+        assert len(sampled) == 10
+        assert len(set(sampled)) == 10
+        assert set(sampled) <= set(ids)
+
+    async def test_reservoir_drops_stale_ids(self, db_session, user_factory):
+        sampler = ReservoirSampler(size=8)
+        repo = UserRepository(db_session, sampler=sampler)
+        ids = (await user_factory.create(repo, 8, "Sample")).inserted_ids
+        await sampler.refill(db_session)
+
+        await db_session.execute(
+            text("DELETE FROM users WHERE id != :id"), {"id": ids[3]}
+        )
+        db_session.expunge_all()
+
+        user = await repo.get_random_user()
+        assert user.id == ids[3]
+
+
+@pytest.mark.asyncio
+class TestRandomSample:
+    async def test_sample_is_distinct(self, db_session, user_factory):
+        repo = UserRepository(db_session, sampler=IdRangeSampler())
+        await user_factory.create(repo, 30, "Sample")
+
+        users = await repo.get_random_users(10)
+        assert len(users) == 10
+        assert len({u.id for u in users}) == 10
+
+    async def test_sample_larger_than_table(self, db_session, user_factory):
+        repo = UserRepository(db_session, sampler=IdRangeSampler())
+        await user_factory.create(repo, 5, "Sample")
+
+        users = await repo.get_random_users(20)
+        assert len({u.id for u in users}) == 5
+
+    async def test_seeded_sample_is_reproducible(self, db_session, user_factory):
+        repo = UserRepository(db_session, sampler=IdRangeSampler())
+        await user_factory.create(repo, 50, "Sample")
+
+        first = await repo.get_random_users(10, seed=42)
+        second = await repo.get_random_users(10, seed=42)
+        assert [u.id for u in first] == [u.id for u in second]
+
+    async def test_sparse_filter_falls_back_to_window(self, db_session, user_factory):
+        repo = UserRepository(db_session, sampler=IdRangeSampler(max_retries=1))
+        ids = (await user_factory.create(repo, 40, "Sample", gender="male")).inserted_ids
+        await db_session.execute(
+            text("UPDATE users SET gender = 'female' WHERE id IN (:a, :b)"),
+            {"a": ids[5], "b": ids[30]}
+        )
+
+        sample = await repo.get_random_users(5, gender="female")
+        assert {u.id for u in sample} == {ids[5], ids[30]}
+
+    async def test_api_sample(self, db_session, test_client, user_factory):
+        await user_factory.create(UserRepository(db_session), 20, "Sample", gender="male")
+
+        response = test_client.get("/api/v1/random", params={"n": 5, "seed": 7})
+        assert response.status_code == 200
+        data = response.json()
+        assert len({u["id"] for u in data}) == 5
+        assert test_client.get("/api/v1/random", params={"n": 5, "seed": 7}).json() == data
+
+        response = test_client.get("/api/v1/random", params={"gender": "female"})
+        assert response.status_code == 404
+
+        response = test_client.get("/api/v1/random", params={"n": 1000})
+        assert response.status_code == 400
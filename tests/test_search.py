@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from fastapi import status
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base
+from app.migrations import MIGRATIONS, run_migrations
+from app.repositories.user_repository import UserRepository
+
+PEOPLE = [
+    ("Anna", "Berg", "female", "Norway"),
+    ("Andre", "Silva", "male", "Brazil"),
+    ("Bruno", "Annan", "male", "Brazil"),
+    ("Clara", "Olsen", "female", "Norway"),
+    ("Dan_ny", "Moss", "male", "Canada"),
+]
+
+
+async def create_people(repo):
+    await repo.bulk_create_users([{
+        "gender": gender,
+        "first_name": first,
+        "last_name": last,
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": "000",
+        "location": f"Country: {country}",
+        "picture_url": "http://test.com/p.jpg",
+        "country": country
+    } for first, last, gender, country in PEOPLE])
+
+
+def names(page):
+    return [u.first_name for u in page.items]
+
+
+@pytest.mark.asyncio
+class TestSearch:
+    async def test_prefix(self, db_session):
+        repo = UserRepository(db_session)
+        await create_people(repo)
+
+        assert names(await repo.search_users("an")) == ["Anna", "Andre", "Bruno"]
+        assert names(await repo.search_users("AN", fields=["first_name"])) == ["Anna", "Andre"]
+
+    async def test_substring(self, db_session):
+        repo = UserRepository(db_session)
+        await create_people(repo)
+
+        assert names(await repo.search_users("ar", mode="substring", fields=["first_name"])) == ["Clara"]
+
+    async def test_wildcards_are_literal(self, db_session):
+        repo = UserRepository(db_session)
+        await create_people(repo)
+
+        assert names(await repo.search_users("dan_", fields=["first_name"])) == ["Dan_ny"]
+        assert names(await repo.search_users("%", mode="substring")) == []
+
+    async def test_filters(self, db_session):
+        repo = UserRepository(db_session)
+        await create_people(repo)
+
+        assert names(await repo.search_users(country="Brazil")) == ["Andre", "Bruno"]
+        assert names(await repo.search_users("an", gender="female", country="Norway")) == ["Anna"]
+
+    async def test_api(self, db_session, test_client):
+        await create_people(UserRepository(db_session))
+
+        response = test_client.get("/api/v1/users/search", params={"q": "an", "limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [u["first_name"] for u in data["items"]] == ["Anna", "Andre"]
+        assert data["items"][0]["country"] == "Norway"
+
+        response = test_client.get(
+            "/api/v1/users/search", params={"q": "an", "cursor": data["next_cursor"]}
+        )
+        assert [u["first_name"] for u in response.json()["items"]] == ["Bruno"]
+
+        response = test_client.get("/api/v1/users/search", params={"fields": "phone"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+class TestMigrations:
+    async def test_upgrades_legacy_table(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, gender VARCHAR(10), "
+                "first_name VARCHAR(50), last_name VARCHAR(50), email VARCHAR(100), "
+                "phone VARCHAR(30), location TEXT, picture_url TEXT)"
+            ))
+
+        assert await run_migrations(engine) == [version for version, _ in MIGRATIONS]
+        assert await run_migrations(engine) == []
+
+        async with engine.connect() as conn:
+            columns = await conn.run_sync(lambda c: {col["name"] for col in inspect(c).get_columns("users")})
+            indexes = set((await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index'")
+            )).scalars())
+        assert {"country", "state", "city", "street_number", "street_name"} <= columns
+        assert "ix_users_country_gender" in indexes
+        assert "ix_users_first_name_lower" in indexes
+        assert "ix_users_first_name_trgm" not in indexes
+        await engine.dispose()
+
+    async def test_fresh_database(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/fresh.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        assert await run_migrations(engine) == [version for version, _ in MIGRATIONS]
+        await engine.dispose()
+
+
+@pytest.mark.postgresql
+@pytest.mark.asyncio
+class TestMigrationsPostgres:
+    async def test_concurrent_workers(self, pg_engine):
+        async with pg_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+
+        # Несколько воркеров стартуют одновременно
+        results = await asyncio.gather(*(run_migrations(pg_engine) for _ in range(4)))
+
+        assert sorted(results, key=len) == [[], [], [], [version for version, _ in MIGRATIONS]]
+        async with pg_engine.begin() as conn:
+            await conn.execute(text("DROP TABLE schema_migrations"))
@@ -0,0 +1,58 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.repositories.user_repository import UserRepository
+from app.services import seeding
+from app.services.seeding import get_seed_job, seed_users
+
+
+@pytest.fixture
+def session_factory(db_session):
+    return sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+class TestSeeding:
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_seeds_up_to_target(self, mock_fetch, db_engine, db_session, session_factory, user_factory):
+        await UserRepository(db_session).create_user({
+            "gender": "female", "first_name": "Existing", "last_name": "User",
+            "email": "existing@test.com", "phone": "0", "picture_url": "http://test.com/e.jpg"
+        })
+        mock_fetch.side_effect = lambda count: [user_factory.api(i, "Seed") for i in range(count)]
+
+        await seed_users(db_engine, session_factory, target=4)
+        job = get_seed_job()
+        assert job.status == "finished"
+        assert job.result["inserted"] == 3
+        assert job.progress == 4
+        assert await UserRepository(db_session).count_users() == 4
+
+        await seed_users(db_engine, session_factory, target=4)
+        assert get_seed_job().result["inserted"] == 0
+        assert mock_fetch.call_count == 1
+
+    @patch('app.services.random_user_service.RandomUserService.fetch_users')
+    async def test_skips_when_lock_taken(self, mock_fetch, db_engine, session_factory, monkeypatch):
+        @asynccontextmanager
+        async def taken(engine, lock_id=seeding.SEED_LOCK_ID):
+            yield False
+
+        monkeypatch.setattr(seeding, "advisory_lock", taken)
+        await seed_users(db_engine, session_factory, target=10)
+        assert get_seed_job().result == {"skipped": True, "inserted": 0}
+        mock_fetch.assert_not_called()
+
+    async def test_failure_reported(self, db_engine, session_factory, test_client):
+        with patch('app.services.random_user_service.RandomUserService.fetch_users',
+                   side_effect=RuntimeError("randomuser.me is down")):
+            await seed_users(db_engine, session_factory, target=10)
+
+        data = test_client.get("/system/ready").json()
+        assert data["ready"] is True
+        assert data["database"] == "ok"
+        assert data["seeding"]["status"] == "failed"
+        assert data["seeding"]["error"] == "randomuser.me is down"
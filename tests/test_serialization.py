@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import User as UserSchema
+from app.serialization import dumps, user_to_dict
+
+
+PERU = {"country": "Peru", "latitude": -12.04}
+
+
+class TestFastPath:
+    @pytest.mark.parametrize("updated_at", [
+        None,
+        datetime(2024, 5, 1, 12, 30),
+        datetime(2024, 5, 1, 12, 30, 15, 500, tzinfo=timezone.utc),
+    ])
+    def test_matches_pydantic(self, updated_at, user_factory):
+        user = User(id=1, updated_at=updated_at, **user_factory.row(1, "Fast", street_number=1, **PERU))
+        expected = UserSchema.model_validate(user).model_dump(mode="json")
+        assert json.loads(dumps(user_to_dict(user))) == expected
+
+    def test_legacy_location_kept(self, user_factory):
+        user = User(id=2, **user_factory.row(2, "Fast", location="Lima", **PERU))
+        assert user_to_dict(user)["location"] == "Lima"
+
+
+@pytest.mark.asyncio
+class TestFastEndpoints:
+    async def test_list_and_batch(self, db_session, test_client, user_factory):
+        result = await user_factory.create(UserRepository(db_session), 3, "Fast", **PERU)
+        ids = result.inserted_ids
+
+        page = test_client.get("/api/v1/users?limit=2").json()
+        assert [u["first_name"] for u in page["items"]] == ["Fast0", "Fast1"]
+        assert page["items"][0]["location"].startswith("Country: Peru")
+        assert page["next_cursor"] is not None
+
+        batch = test_client.get(f"/api/v1/users?ids={ids[2]},{ids[0]},999999").json()
+        assert [u["id"] for u in batch["items"]] == [ids[2], ids[0]]
+        assert batch["missing"] == [999999]
+
+        sample = test_client.get("/api/v1/random?n=3").json()
+        assert sorted(u["id"] for u in sample) == sorted(ids)
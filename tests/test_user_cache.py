@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from fastapi import status
+
+from app.cache import InMemoryBackend, LRUCache
+from app.events import notify_users_changed
+from app.repositories.cached_user_repository import CachedUserRepository, UserCache
+from app.repositories.user_repository import UserRepository
+
+
+class CountingLoader:
+    def __init__(self, repo, delay=0.0):
+        self.repo = repo
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, user_id):
+        async def load():
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return await self.repo.get_user(user_id)
+        return load
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_size=2, ttl=-1)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+class TestUserCache:
+    async def test_read_through(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(0, "Cached"))
+        cache = UserCache()
+        loader = CountingLoader(repo)
+
+        first = await cache.get_or_load(user.id, loader(user.id))
+        second = await cache.get_or_load(user.id, loader(user.id))
+
+        assert first.first_name == second.first_name == "Cached0"
+        assert loader.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    async def test_concurrent_misses_are_coalesced(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(1, "Cached"))
+        cache = UserCache()
+        loader = CountingLoader(repo, delay=0.01)
+
+        results = await asyncio.gather(*(
+            cache.get_or_load(user.id, loader(user.id)) for _ in range(10)
+        ))
+
+        assert loader.calls == 1
+        assert {r.id for r in results} == {user.id}
+
+    async def test_second_tier_backend(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(2, "Cached"))
+        backend = InMemoryBackend()
+        await UserCache(backend=backend).get_or_load(user.id, CountingLoader(repo)(user.id))
+
+        other_process = UserCache(backend=backend)
+        loader = CountingLoader(repo)
+        cached = await other_process.get_or_load(user.id, loader(user.id))
+
+        assert cached.email == "cached2@test.com"
+        assert loader.calls == 0
+        assert other_process.stats()["backend_hits"] == 1
+
+    async def test_invalidation(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(3, "Cached"))
+        backend = InMemoryBackend()
+        cache = UserCache(backend=backend)
+        loader = CountingLoader(repo)
+        await cache.get_or_load(user.id, loader(user.id))
+
+        cache.invalidate()
+        await cache.get_or_load(user.id, loader(user.id))
+        assert loader.calls == 2
+
+    async def test_invalidation_reaches_other_processes(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(6, "Cached"))
+        backend = InMemoryBackend()
+        writer, reader = UserCache(backend=backend), UserCache(backend=backend)
+        loader = CountingLoader(repo)
+        await writer.get_or_load(user.id, loader(user.id))
+
+        writer.invalidate()
+        await asyncio.sleep(0)
+        # У reader своё локальное поколение, но запись прошлого поколения он уже не видит
+        await reader.get_or_load(user.id, loader(user.id))
+
+        assert loader.calls == 2
+        assert reader.stats()["backend_hits"] == 0
+
+    async def test_invalidation_during_load_is_not_cached(self, db_session, user_factory):
+        repo = UserRepository(db_session)
+        user = await repo.create_user(user_factory.row(5, "Cached"))
+        backend = InMemoryBackend()
+        cache = UserCache(backend=backend)
+        loader = CountingLoader(repo, delay=0.01)
+
+        loading = asyncio.create_task(cache.get_or_load(user.id, loader(user.id)))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        # Промах после invalidate не присоединяется к устаревшей загрузке
+        fresh = await cache.get_or_load(user.id, loader(user.id))
+
+        assert (await loading).id == fresh.id == user.id
+        assert loader.calls == 2
+        # Загрузка поколения 0 завершилась после invalidate и в backend не попала
+        assert await backend.get(f"user:0:{user.id}") is None
+        assert await backend.get(f"user:1:{user.id}") is not None
+
+    async def test_api_uses_shared_cache(self, db_session, test_client, user_factory):
+        user = await UserRepository(db_session).create_user(user_factory.row(4, "Cached"))
+        cached_repo = CachedUserRepository(db_session)
+        before = cached_repo.cache.stats()
+
+        assert test_client.get(f"/api/v1/{user.id}").status_code == status.HTTP_200_OK
+        assert test_client.get(f"/{user.id}").status_code == status.HTTP_200_OK
+
+        stats = test_client.get("/system/cache").json()["users"]
+        assert stats["misses"] == before["misses"] + 1
+        assert stats["hits"] == before["hits"] + 1
+
+        notify_users_changed()
+        assert cached_repo.cache.peek(user.id) is None